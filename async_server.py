@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+asyncio HTTP server for the Dream-Quote Matcher web interface.
+Same routes as server.py, but every connection is a coroutine instead of a
+thread, so thousands of idle keep-alive browser connections cost little.
+Static files are read off the event loop and /match runs on server.py's
+bounded match pool, answering 503 when it is full.
+
+Run with: python3 async_server.py (PORT sets the port, default 8000)
+"""
+
+import asyncio
+import json
+import os
+from http import HTTPStatus
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from server import (KEEPALIVE_MAX_REQUESTS, KEEPALIVE_TIMEOUT, MAX_BODY_BYTES, MISSING_PAGE, match_executor,
+                    static_assets, static_file)
+
+# Largest request head accepted
+MAX_HEADER_BYTES = 64 * 1024
+
+
+class BadRequest(Exception):
+    """The request cannot be parsed; answered with its status and the connection closed."""
+    def __init__(self, status: int):
+        super().__init__(status)
+        self.status = status
+
+
+def build_head(status: int, body_length: int = 0, content_type: Optional[str] = None,
+               keep_alive: bool = True, headers: Tuple[Tuple[str, str], ...] = ()) -> bytes:
+    """Serialized HTTP/1.1 status line and headers; Content-Length is always sent so keep-alive works."""
+    lines = [f'HTTP/1.1 {status} {HTTPStatus(status).phrase}']
+    if content_type:
+        lines.append(f'Content-Type: {content_type}')
+    if status != 304:
+        lines.append(f'Content-Length: {body_length}')
+    lines.append('Connection: keep-alive' if keep_alive else 'Connection: close')
+    lines.extend(f'{name}: {value}' for name, value in headers)
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+def json_body(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, str, Dict[str, str], bytes]]:
+    """Read one request: (method, target, version, headers, body), or None when the client is done."""
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise BadRequest(431)
+
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, version = lines[0].split(' ')
+    except ValueError:
+        raise BadRequest(400)
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+    if 'transfer-encoding' in headers:
+        raise BadRequest(501)
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise BadRequest(400)
+    if length < 0:
+        raise BadRequest(400)
+    if length > MAX_BODY_BYTES:
+        raise BadRequest(413)
+    # A client that stops mid-body is dropped like an idle one
+    try:
+        body = await asyncio.wait_for(reader.readexactly(length), KEEPALIVE_TIMEOUT) if length else b''
+    except asyncio.TimeoutError:
+        return None
+    return method, target, version, headers, body
+
+
+def load_and_respond(file_path: Path, content_type: str, query: Dict, validators: Tuple) -> Optional[Tuple]:
+    """static_assets.get() and respond() for a worker thread; None if the file does not exist."""
+    asset = static_assets.get(file_path, content_type)
+    return static_assets.respond(asset, query, *validators) if asset is not None else None
+
+
+async def handle_get(target: str, headers: Dict[str, str]) -> Tuple[int, bytes, Optional[str], Tuple[Tuple[str, str], ...]]:
+    """Static files from the shared asset cache; disk reads run on a worker thread."""
+    route = static_file(target)
+    if route is None:
+        return 404, b'', None, ()
+    file_path, content_type = route
+    loop = asyncio.get_running_loop()
+    query = parse_qs(urlparse(target).query)
+    validators = (headers.get('if-none-match'), headers.get('if-modified-since'))
+    # Cached and recently checked files are answered on the loop; checking a
+    # file on disk, loading it or reading one too big for the cache is not
+    asset = static_assets.fresh(file_path)
+    if asset is not None and asset.body is not None:
+        answer = static_assets.respond(asset, query, *validators)
+    else:
+        answer = await loop.run_in_executor(None, load_and_respond, file_path, content_type, query, validators)
+    if answer is None:
+        if content_type == 'text/html':
+            return 200, MISSING_PAGE, content_type, ()
+        return 404, b'', None, ()
+    status, body, asset_headers = answer
+    return status, body, content_type if status == 200 else None, tuple(asset_headers)
+
+
+async def handle_match(body: bytes) -> Tuple[int, bytes, Tuple[Tuple[str, str], ...]]:
+    """/match: the same answers as DreamMatcherHandler.do_POST."""
+    try:
+        dream_text = json.loads(body.decode('utf-8')).get('dream', '')
+        if not dream_text:
+            return 400, json_body({'error': 'No dream text provided'}), ()
+        future = match_executor.submit(dream_text)
+        if future is None:
+            return 503, json_body({'error': 'Server busy, please try again'}), (('Retry-After', '1'),)
+        result = await asyncio.wrap_future(future)
+        return 200, json_body(result), (('Access-Control-Allow-Origin', '*'),)
+    except Exception as e:
+        return 500, json_body({'error': str(e)}), ()
+
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Serve requests on one connection until the client or a limit closes it."""
+    try:
+        for served in range(1, KEEPALIVE_MAX_REQUESTS + 1):
+            try:
+                request = await read_request(reader)
+            except BadRequest as e:
+                writer.write(build_head(e.status, keep_alive=False))
+                await writer.drain()
+                break
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            if request is None:
+                break
+            method, target, version, headers, body = request
+
+            # HTTP/1.1 keeps connections open unless asked not to; HTTP/1.0 only when asked
+            connection = headers.get('connection', '').lower()
+            if version == 'HTTP/1.1':
+                keep_alive = connection != 'close'
+            else:
+                keep_alive = connection == 'keep-alive'
+            keep_alive = keep_alive and served < KEEPALIVE_MAX_REQUESTS
+
+            extra_headers = ()
+            content_type = None
+            if method in ('GET', 'HEAD'):
+                status, response_body, content_type, extra_headers = await handle_get(target, headers)
+            elif method == 'POST' and target == '/match':
+                status, response_body, extra_headers = await handle_match(body)
+                content_type = 'application/json'
+            elif method == 'POST':
+                status, response_body = 404, b''
+            else:
+                status, response_body = 501, b''
+
+            writer.write(build_head(status, len(response_body), content_type, keep_alive, extra_headers))
+            if method != 'HEAD' and response_body:
+                writer.write(response_body)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(port: int):
+    server = await asyncio.start_server(handle_connection, '', port, limit=MAX_HEADER_BYTES, backlog=1024)
+    print(f"\nDream-Quote Matcher Server (asyncio)")
+    print(f"Server running at http://0.0.0.0:{port}/")
+    print(f"Open http://localhost:{port}/dream_matcher.html in your browser")
+    print("Press Ctrl+C to stop the server\n")
+    async with server:
+        await server.serve_forever()
+
+
+def run_server(port=8000):
+    """Run the asyncio HTTP server."""
+    # Get port from environment variable (for cloud hosting) or use default
+    port = int(os.environ.get('PORT', port))
+    try:
+        asyncio.run(serve(port))
+    except KeyboardInterrupt:
+        print("\n\nServer stopped.")
+
+
+if __name__ == '__main__':
+    run_server()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Batch dream interpretation from the command line.
+Reads dreams from a file or stdin (one per line, or JSONL objects with a
+"dream" field and optional "id"), matches them on a pool of worker
+processes and streams JSONL results to stdout in input order.
+
+Examples:
+    python batch_interpret.py journal.txt > results.jsonl
+    python batch_interpret.py archive.jsonl --output results.jsonl --resume
+    cat dreams.txt | python batch_interpret.py - --workers 4
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Dict, Iterator, TextIO, Tuple
+
+# One matcher per worker process, built by _init_worker
+_matcher = None
+
+
+def _init_worker(normalized_explanations: bool):
+    """Build the matcher once per worker; its loading messages go to stderr."""
+    global _matcher
+    from dream_quote_matcher import DreamQuoteMatcher
+    with contextlib.redirect_stdout(sys.stderr):
+        _matcher = DreamQuoteMatcher(normalized_explanations=normalized_explanations)
+
+
+def _match_chunk(records: List[Dict]) -> List[str]:
+    """Match a chunk of records in a worker and return serialized JSONL lines."""
+    valid = [record for record in records if "error" not in record]
+    results = iter(_matcher.match_many([record["dream"] for record in valid]))
+    lines = []
+    for record in records:
+        if "error" not in record:
+            record["result"] = next(results)
+        lines.append(json.dumps(record, ensure_ascii=False))
+    return lines
+
+
+def read_records(stream: TextIO, input_format: str) -> Iterator[Dict]:
+    """Yield one record per non-empty input line: {"index", "dream"[, "id"]} or {"index", "error"}."""
+    index = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        record = {"index": index}
+        if input_format == "jsonl" or (input_format == "auto" and line.startswith("{")):
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                record["error"] = f"Invalid JSON: {e}"
+            else:
+                if not isinstance(data, dict):
+                    record["error"] = "Expected a JSON object"
+                else:
+                    if "id" in data:
+                        record["id"] = data["id"]
+                    dream = data.get("dream", "")
+                    if isinstance(dream, str):
+                        record["dream"] = dream
+                    else:
+                        record["error"] = 'Field "dream" must be a string'
+        else:
+            record["dream"] = line
+        index += 1
+        yield record
+
+
+def count_lines(path: str) -> Tuple[int, int]:
+    """
+    Count complete result lines already written (for --resume).
+    Returns (lines, byte offset just past the last complete line).
+    """
+    if not os.path.exists(path):
+        return 0, 0
+    lines = end = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if line.endswith(b"\n"):
+                lines += 1
+                end += len(line)
+    return lines, end
+
+
+def resume_output(path: str) -> int:
+    """
+    Prepare an output file for --resume: drop a partial last line left by an
+    interrupted run, so appended records start on a line of their own.
+    Returns the number of complete records it holds.
+    """
+    lines, end = count_lines(path)
+    if os.path.exists(path):
+        with open(path, "r+b") as f:
+            f.truncate(end)
+    return lines
+
+
+def run(records: Iterator[Dict], output: TextIO, workers: int, chunk_size: int,
+        progress_interval: float, normalized_explanations: bool = False) -> int:
+    """Match records on a process pool and write results in input order. Returns the count written."""
+    # At most 2 chunks per worker are in memory at any time
+    max_in_flight = workers * 2
+    written = 0
+    started = last_report = time.time()
+
+    def report(final: bool = False):
+        elapsed = max(time.time() - started, 1e-9)
+        end = "\n" if final else "\r"
+        print(f"Processed {written} dreams in {elapsed:.1f}s ({written / elapsed:.1f} dreams/s)",
+              end=end, file=sys.stderr, flush=True)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(normalized_explanations,)) as pool:
+        pending = deque()
+        records = iter(records)
+        while True:
+            while len(pending) < max_in_flight:
+                chunk = list(islice(records, chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_match_chunk, chunk))
+            if not pending:
+                break
+
+            # Write the oldest chunk first to keep input order; flush whole
+            # chunks so --resume can count complete lines
+            lines = pending.popleft().result()
+            output.write("".join(line + "\n" for line in lines))
+            output.flush()
+            written += len(lines)
+
+            now = time.time()
+            if progress_interval and now - last_report >= progress_interval:
+                report()
+                last_report = now
+    report(final=True)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interpret many dreams in parallel and write JSONL results.")
+    parser.add_argument("input", nargs="?", default="-", help="Input file, or - for stdin (default)")
+    parser.add_argument("--output", "-o", help="Output JSONL file (default: stdout)")
+    parser.add_argument("--format", choices=["auto", "lines", "jsonl"], default="auto",
+                        help="Input format: plain lines, JSONL with a \"dream\" field, or auto-detect per line")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Dreams per work unit (default: 64)")
+    parser.add_argument("--skip", type=int, default=0, help="Skip the first N input records")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip as many records as --output already holds and append to it")
+    parser.add_argument("--progress", type=float, default=2.0, help="Seconds between progress reports (0 to disable)")
+    parser.add_argument("--normalized", action="store_true", help="Return normalized explanation texts")
+    args = parser.parse_args()
+
+    skip = args.skip
+    if args.resume:
+        if not args.output:
+            parser.error("--resume requires --output")
+        skip += resume_output(args.output)
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    output_stream = sys.stdout if not args.output else open(args.output, "a" if args.resume else "w", encoding="utf-8")
+    try:
+        records = islice(read_records(input_stream, args.format), skip, None)
+        if skip:
+            print(f"Resuming at record {skip}", file=sys.stderr)
+        run(records, output_stream, max(1, args.workers), max(1, args.chunk_size), args.progress,
+            args.normalized)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Build the matcher index snapshot (data/matcher_snapshot.pickle) with its
+column files (data/matcher_snapshot.<column>.pickle) and string tables
+(data/matcher_snapshot.*.strings).
+DreamQuoteMatcher loads them at startup instead of parsing the JSON databases
+and rebuilding every index, as long as the databases have not changed since.
+Re-run after editing data/dream_database.json or data/quotes_database.json.
+"""
+
+import time
+
+from dream_quote_matcher import DreamQuoteMatcher, SNAPSHOT_FILE
+
+
+def main():
+    started = time.time()
+    matcher = DreamQuoteMatcher(use_snapshot=False)
+    print(f"Built index in {time.time() - started:.2f}s")
+    
+    matcher.save_snapshot(SNAPSHOT_FILE)
+    size_mb = SNAPSHOT_FILE.stat().st_size / (1024 * 1024)
+    print(f"Saved snapshot to {SNAPSHOT_FILE} ({size_mb:.1f} MB)")
+    for path in sorted(SNAPSHOT_FILE.parent.glob(f"{SNAPSHOT_FILE.stem}.*")):
+        print(f"  {path.name}: {path.stat().st_size / (1024 * 1024):.1f} MB")
+    for name, checksum in matcher.source_checksums.items():
+        print(f"  {name}: sha256 {checksum[:16]}...")
+    
+    started = time.time()
+    DreamQuoteMatcher()
+    print(f"Snapshot startup: {time.time() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Shared fixture data for the matcher tests: a few dreams and a small quote corpus."""
+
+import json
+from pathlib import Path
+
+import dream_quote_matcher
+from dream_quote_matcher import DreamQuoteMatcher
+
+DREAMS = [
+    "I saw a snake in my dream",
+    "I dreamed about a dragon flying over a castle",
+    "I was abandoned by my friends in the dream and lost my fortune",
+    "A zorblax snake and a quuxinator castle",
+    "",
+]
+
+QUOTES = [
+    {"quote": "The snake which cannot cast its skin has to die.", "author": "Nietzsche", "keywords": ["snake", "skin", "die", "cast"]},
+    {"quote": "Fortune favors the bold.", "author": "Virgil", "keywords": ["fortune", "bold", "favors", "unknown"]},
+    {"quote": "A castle in the air is a dream of friends.", "author": "Unknown", "keywords": ["castle", "air", "dream", "friends"]},
+]
+
+
+def build_matcher(tmp_path, monkeypatch, quotes=QUOTES, **options):
+    """Matcher over the real dream database and the given quotes."""
+    monkeypatch.chdir(Path(__file__).parent)
+    quotes_file = tmp_path / "quotes_database.json"
+    quotes_file.write_text(json.dumps({"quotes": quotes}), encoding="utf-8")
+    monkeypatch.setattr(dream_quote_matcher, "QUOTES_DB_FILE", quotes_file)
+    return DreamQuoteMatcher(**options)
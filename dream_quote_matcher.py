@@ -6,59 +6,589 @@ chooses best explanation by token overlap, and selects quotes by keyword overlap
 All processing is deterministic and offline.
 """
 
+import hashlib
+import heapq
 import json
+import os
+import pickle
 import re
+import sys
+import threading
+from array import array
 from pathlib import Path
 from collections import Counter
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union, Iterable, Iterator, Callable
+
+from phrase_matcher import PhraseMatcher, select_longest
+from vector_scorer import VectorScorer, NUMPY_AVAILABLE
+from string_table import StringTable
+from result_cache import ResultCache, PersistentResultCache
+from tokenizer import tokenize, normalize_plural, analyze, fold, PHRASE_STOPWORDS
 
 DREAM_DB_FILE = Path("data/dream_database.json")
 QUOTES_DB_FILE = Path("data/quotes_database.json")
+SNAPSHOT_FILE = Path("data/matcher_snapshot.pickle")
+
+# Bump when the layout of the built index changes; older snapshots are ignored
+SNAPSHOT_VERSION = 6
+
+# Bump when match() output changes for the same databases (tokenizing, ranking,
+# result format); cached results of older versions are never returned
+MATCHER_VERSION = 1
+
+# Matcher attributes built by _build_indexes and stored in the main snapshot file
+SNAPSHOT_ATTRIBUTES = (
+    "dream_db", "dream_word_map",
+    "symbol_words", "symbol_exact_index", "symbol_form_index", "phrase_matcher",
+    "symbol_key_ids", "duplicate_rows",
+    "vocabulary", "singular_forms", "quote_texts", "quote_records", "quote_tokens", "quote_text_ranks",
+    "candidate_static_scores", "candidate_match_counts", "candidate_positions",
+)
+
+# Columns stored in their own snapshot files. A matcher loads the columns its
+# output mode needs at startup and any other column the first time it is used
+SNAPSHOT_COLUMNS = {
+    "explanations": ("explanation_texts", "explanation_tokens", "explanation_lengths"),
+    "normalized": ("normalized_texts", "normalized_tokens", "normalized_lengths"),
+    "assets": ("book_names", "emoji_names", "book_ids", "emoji_ids"),
+}
+COLUMN_OF_ATTRIBUTE = {name: column for column, names in SNAPSHOT_COLUMNS.items() for name in names}
+
+# Static text lives in string tables saved next to the snapshot and mmap'd when loaded
+STRING_TABLE_ATTRIBUTES = ("explanation_texts", "normalized_texts", "quote_texts", "quote_records")
+
+# Words of quote text, as delimited by the \b boundaries in _quote_contains_symbol
+QUOTE_WORD_RE = re.compile(r'\w+')
+
+# Weight of the dream-overlap (Jaccard) term in quote scores; it bounds how
+# much a dream can move a quote past the static keyword/text scores
+QUOTE_OVERLAP_WEIGHT = 2
+
+# Candidate lists at least this long are scored by the NumPy engine when available
+VECTOR_MIN_CANDIDATES = 64
+
+
+def top_k(items: Iterable, key: Callable, k: Optional[int] = 1) -> List:
+    """sorted(items, key=key)[:k] without sorting every item; k=None sorts them all."""
+    if k is None:
+        return sorted(items, key=key)
+    return heapq.nsmallest(k, items, key=key)
+
+
+def iter_ranked(items: Iterable, key: Callable) -> Iterator:
+    """Items in sorted(items, key=key) order, popped from a heap as the consumer asks for them."""
+    # The index keeps ties in input order, like the stable sort
+    heap = [(key(item), index, item) for index, item in enumerate(items)]
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+class MatchContext:
+    """
+    Request-scoped view of one dream text, tokenized exactly once.
+    Created in match() and passed through every scoring stage.
+    """
+    def __init__(self, matcher: "DreamQuoteMatcher", dream_text: str):
+        self.dream_text = dream_text
+        # Meaningful tokens in dream order
+        self.tokens = []
+        # (token, singular form) pairs for plural/singular matching
+        self.forms = []
+        # Distinct tokens in the matcher's vocabulary ID space
+        self.token_ids = []
+        self.oov_count = 0
+        self.singular = {}
+        for token, singular, token_id in analyze(dream_text, matcher.vocabulary, matcher.singular_forms):
+            self.tokens.append(token)
+            self.forms.append((token, singular))
+            if token not in self.singular:
+                self.singular[token] = singular
+                if token_id is None:
+                    self.oov_count += 1
+                else:
+                    self.token_ids.append(token_id)
+        self.token_set = frozenset(self.tokens)
+        # match() output depends only on the token sequence, so dreams with
+        # the same signature are equivalent ("I saw a snake" == "i SAW a snake!!")
+        self.signature = tuple(self.tokens)
+        self.id_set = frozenset(self.token_ids)
+
+
+class DreamSymbol:
+    """
+    One dream database entry. Text lives in the matcher's string tables and
+    book/emoji in its asset columns, indexed by the entry's position.
+    """
+    __slots__ = ("word", "position", "explanation_rows", "normalized_rows",
+                 "normalized_short_row", "quote_candidates")
+
+    def __init__(self, word: str, position: int, explanation_rows: range,
+                 normalized_rows: range, normalized_short_row: Optional[int]):
+        self.word = word
+        self.position = position
+        self.explanation_rows = explanation_rows
+        self.normalized_rows = normalized_rows
+        self.normalized_short_row = normalized_short_row
+        # Range of this symbol's quote candidates in the matcher's candidate arrays
+        self.quote_candidates = range(0)
+
+
+class TokenRows:
+    """Distinct vocabulary token IDs of many texts, stored back to back in two arrays."""
+    __slots__ = ("token_ids", "offsets")
 
-class DreamQuoteMatcher:
     def __init__(self):
-        """Initialize the matcher with loaded databases."""
-        print("Loading dream database...")
-        with open(DREAM_DB_FILE, "r", encoding="utf-8") as f:
-            self.dream_db = json.load(f)
-        
-        print("Loading quotes database...")
-        with open(QUOTES_DB_FILE, "r", encoding="utf-8") as f:
-            quotes_data = json.load(f)
-            self.quotes_db = quotes_data.get("quotes", [])
-        
-        # Create lookup structures for efficient matching
-        self._build_indexes()
+        self.token_ids = array("I")
+        self.offsets = array("I", [0])
+
+    def append(self, token_ids: Iterable[int]):
+        self.token_ids.extend(sorted(token_ids))
+        self.offsets.append(len(self.token_ids))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> array:
+        return self.token_ids[self.offsets[row]:self.offsets[row + 1]]
+
+
+class DreamQuoteMatcher:
+    def __init__(self, strict_phrases: bool = False, longest_phrases: bool = False,
+                 vector_scoring: bool = True, use_snapshot: bool = True,
+                 normalized_explanations: bool = False, cache_size: int = 1024,
+                 cache_bytes: Optional[int] = 8 * 1024 * 1024, cache_path: Optional[Path] = None):
+        """
+        Initialize the matcher with loaded databases.
+        strict_phrases: multi-word symbols must appear as adjacent words in order.
+        longest_phrases: keep only the longest non-overlapping multi-word symbols.
+        vector_scoring: score long candidate lists with NumPy when it is installed.
+        use_snapshot: load the prebuilt index (see build_snapshot.py) when it is fresh.
+        normalized_explanations: choose and return the normalized explanations
+            (see normalize_dream_database.py) instead of the original ones.
+        cache_size, cache_bytes: bounds of the LRU cache of match() results
+            (cache_size=0 disables it, cache_bytes=None means no byte limit).
+        cache_path: SQLite file that keeps match() results across restarts
+            (None disables the persistent cache).
+        """
+        self.strict_phrases = strict_phrases
+        self.longest_phrases = longest_phrases
+        self.vector_scoring = vector_scoring and NUMPY_AVAILABLE
+        self.normalized_explanations = normalized_explanations
+        self.result_cache = ResultCache(cache_size, cache_bytes) if cache_size > 0 else None
+        self.persistent_cache = PersistentResultCache(cache_path) if cache_path else None
+        # Snapshot columns not loaded yet (see __getattr__)
+        self.unloaded_columns = set()
+        self.column_lock = threading.Lock()
+        # Quote posting lists are only built while building quote candidates
+        self.keyword_to_quotes = None
+        self.quote_word_index = None
+        
+        # Content checksums of the source databases identify this index version
+        with open(DREAM_DB_FILE, "rb") as f:
+            dream_data = f.read()
+        with open(QUOTES_DB_FILE, "rb") as f:
+            quotes_data = f.read()
+        self.source_checksums = {
+            DREAM_DB_FILE.name: hashlib.sha256(dream_data).hexdigest(),
+            QUOTES_DB_FILE.name: hashlib.sha256(quotes_data).hexdigest(),
+        }
+        self.db_version = hashlib.sha256(json.dumps(self.source_checksums, sort_keys=True).encode()).hexdigest()[:16]
+        
+        if use_snapshot and self._load_snapshot(SNAPSHOT_FILE):
+            print("Loaded index snapshot.")
+        else:
+            print("Loading dream database...")
+            dream_entries = json.loads(dream_data.decode("utf-8"))
+            
+            print("Loading quotes database...")
+            quotes = json.loads(quotes_data.decode("utf-8")).get("quotes", [])
+            
+            # Move the text into string tables and create lookup structures for efficient matching
+            self.unloaded_columns = set()
+            self._build_string_tables(dream_entries, quotes)
+            self._build_indexes()
+        self._build_vector_scorer()
         print("Databases loaded and indexed.")
     
+    def _string_table_path(self, snapshot_path: Path, name: str) -> Path:
+        """String table file saved next to a snapshot, e.g. data/matcher_snapshot.quote_texts.strings."""
+        return snapshot_path.with_name(f"{snapshot_path.stem}.{name}.strings")
+    
+    def _string_table_tag(self) -> str:
+        """Tag tying string table files to one snapshot layout and database version."""
+        return f"v{SNAPSHOT_VERSION}-{self.db_version}"
+    
+    def _column_path(self, snapshot_path: Path, column: str) -> Path:
+        """Snapshot file of a column, e.g. data/matcher_snapshot.explanations.pickle."""
+        return snapshot_path.with_name(f"{snapshot_path.stem}.{column}.pickle")
+    
+    def _output_columns(self) -> List[str]:
+        """Snapshot columns that match() reads in the active output mode."""
+        return ["normalized" if self.normalized_explanations else "explanations", "assets"]
+    
+    def _load_snapshot(self, path: Path) -> bool:
+        """Load the built index from a snapshot if it matches this version and the source databases."""
+        values = self._read_snapshot_file(path)
+        if values is None:
+            return False
+        for name, value in values.items():
+            setattr(self, name, value)
+        
+        # Other columns are loaded on first use
+        self.snapshot_path = path
+        self.unloaded_columns = set(SNAPSHOT_COLUMNS)
+        for column in self._output_columns():
+            if not self._load_column(column):
+                return False
+        return True
+    
+    def _load_column(self, column: str) -> bool:
+        """Load one column from the snapshot files."""
+        values = self._read_snapshot_file(self.snapshot_path, column)
+        if values is None:
+            return False
+        for name, value in values.items():
+            setattr(self, name, value)
+        self.unloaded_columns.discard(column)
+        return True
+    
+    def __getattr__(self, name: str):
+        """Load a snapshot column the first time one of its attributes is used."""
+        # Only called for attributes that are not set
+        column = COLUMN_OF_ATTRIBUTE.get(name)
+        if column is None or column not in self.__dict__.get("unloaded_columns", ()):
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        with self.column_lock:
+            if column in self.unloaded_columns and not self._load_column(column):
+                raise RuntimeError(f"Snapshot column {column} does not match the loaded index; "
+                                   f"re-run build_snapshot.py and restart.")
+        return getattr(self, name)
+    
+    def _read_snapshot_file(self, snapshot_path: Path, column: Optional[str] = None) -> Optional[Dict]:
+        """
+        Read the attributes of the main snapshot file or of one column, with
+        their string tables. Returns None if they are missing, unreadable, or
+        built for another version of the index or the source databases.
+        """
+        path = snapshot_path if column is None else self._column_path(snapshot_path, column)
+        names = SNAPSHOT_ATTRIBUTES if column is None else SNAPSHOT_COLUMNS[column]
+        try:
+            with open(path, "rb") as f:
+                snapshot = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable snapshot {path}: {e}")
+            return None
+        
+        if (not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION
+                or snapshot.get("source_checksums") != self.source_checksums):
+            print(f"Snapshot {path} is stale, ignoring it.")
+            return None
+        
+        values = dict(snapshot["index"])
+        for name in names:
+            if name in STRING_TABLE_ATTRIBUTES:
+                values[name] = StringTable.open(self._string_table_path(snapshot_path, name), self._string_table_tag())
+                if values[name] is None:
+                    print(f"String table {name} for snapshot {snapshot_path} is missing or stale, ignoring it.")
+                    return None
+        return values
+    
+    def save_snapshot(self, path: Path = SNAPSHOT_FILE):
+        """
+        Write the built index to a versioned binary snapshot, tagged with the
+        source checksums: the main file, one file per column, and the string
+        tables next to them.
+        """
+        for column in SNAPSHOT_COLUMNS:
+            self._write_snapshot_file(path, column)
+        self._write_snapshot_file(path)
+    
+    def _write_snapshot_file(self, snapshot_path: Path, column: Optional[str] = None):
+        """Write the main snapshot file or one column; string tables go to their own files."""
+        path = snapshot_path if column is None else self._column_path(snapshot_path, column)
+        names = SNAPSHOT_ATTRIBUTES if column is None else SNAPSHOT_COLUMNS[column]
+        for name in names:
+            if name in STRING_TABLE_ATTRIBUTES:
+                getattr(self, name).save(self._string_table_path(snapshot_path, name), self._string_table_tag())
+        
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "source_checksums": self.source_checksums,
+            "index": {name: getattr(self, name) for name in names if name not in STRING_TABLE_ATTRIBUTES},
+        }
+        # Write to a temporary file first so readers never see a partial snapshot
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    
+    def _build_string_tables(self, dream_entries: List[Dict], quotes: List[Dict]):
+        """
+        Store all explanation and quote text in string tables and the dream
+        entries as DreamSymbol records that refer to their text by row ranges.
+        """
+        explanations = []
+        normalized = []
+        # Book and emoji file names as small-integer enums, one ID per entry
+        self.book_names = []
+        self.emoji_names = []
+        self.book_ids = array("H")
+        self.emoji_ids = array("H")
+        book_ids = {}
+        emoji_ids = {}
+        self.dream_db = []
+        for position, entry in enumerate(dream_entries):
+            book_id = book_ids.setdefault(entry.get("book"), len(book_ids))
+            if book_id == len(self.book_names):
+                self.book_names.append(entry.get("book"))
+            self.book_ids.append(book_id)
+            emoji_id = emoji_ids.setdefault(entry.get("emoji"), len(emoji_ids))
+            if emoji_id == len(self.emoji_names):
+                self.emoji_names.append(entry.get("emoji"))
+            self.emoji_ids.append(emoji_id)
+            
+            start = len(explanations)
+            explanations.extend(entry.get("explanations", []))
+            explanation_rows = range(start, len(explanations))
+            start = len(normalized)
+            normalized.extend(entry.get("normalized", []))
+            normalized_rows = range(start, len(normalized))
+            normalized_short_row = None
+            if entry.get("normalized_short"):
+                normalized_short_row = len(normalized)
+                normalized.append(entry["normalized_short"])
+            self.dream_db.append(DreamSymbol(sys.intern(entry["word"]), position, explanation_rows,
+                                             normalized_rows, normalized_short_row))
+        self.explanation_texts = StringTable.from_strings(explanations)
+        self.normalized_texts = StringTable.from_strings(normalized)
+        # Explanation ties are broken by length in characters
+        self.explanation_lengths = array("I", [len(explanation) for explanation in explanations])
+        self.normalized_lengths = array("I", [len(explanation) for explanation in normalized])
+        
+        quote_texts = [quote.get("quote", "") for quote in quotes]
+        self.quote_texts = StringTable.from_strings(quote_texts)
+        # Everything but the text, in the original key order; _quote() puts the text back
+        self.quote_records = StringTable.from_strings(
+            json.dumps({key: (None if key == "quote" else value) for key, value in quote.items()}, ensure_ascii=False)
+            for quote in quotes
+        )
+        # Quote ties are broken by text, so keep each quote's rank in text order
+        text_ranks = {text: rank for rank, text in enumerate(sorted(set(quote_texts)))}
+        self.quote_text_ranks = array("I", [text_ranks[text] for text in quote_texts])
+    
     def _build_indexes(self):
         """Build indexes for fast lookup."""
-        # Create lowercase word -> dream entry mapping
+        # Inverted symbol index: surface form (exact or plural/singular variant)
+        # -> positions in dream_db, so matching only looks up the dream's tokens
+        self.symbol_words = [sys.intern(entry.word.lower()) for entry in self.dream_db]
+        
+        # Create lowercase word -> dream entry mapping (look up with word.lower())
         self.dream_word_map = {}
-        for entry in self.dream_db:
-            word = entry["word"]
-            # Store both original case and lowercase
-            self.dream_word_map[word.lower()] = entry
-            self.dream_word_map[word] = entry
+        for symbol_word, entry in zip(self.symbol_words, self.dream_db):
+            self.dream_word_map.setdefault(symbol_word, entry)
+        
+        # Token IDs and singular forms of every word the index knows
+        self._build_vocabulary()
+        self._build_singular_forms()
+        
+        self.symbol_exact_index = {}
+        self.symbol_form_index = {}
+        phrase_symbols = []
+        for position, symbol_word in enumerate(self.symbol_words):
+            # Keys are folded like dream tokens, so "Déjà Vu" is found from "deja"
+            symbol_word = fold(symbol_word)
+            symbol_words = symbol_word.split()
+            if len(symbol_words) == 1:
+                self.symbol_exact_index.setdefault(symbol_word, []).append(position)
+                for form in {symbol_word, self._normalize_plural(symbol_word)}:
+                    self.symbol_form_index.setdefault(form, []).append(position)
+            else:
+                # Multi-word phrase - keep only its meaningful words
+                meaningful_symbol_words = [
+                    sw for sw in symbol_words
+                    if len(sw) >= 3 and sw not in PHRASE_STOPWORDS
+                ]
+                if meaningful_symbol_words:
+                    phrase_forms = [(sw, self._normalize_plural(sw)) for sw in meaningful_symbol_words]
+                    phrase_symbols.append((position, phrase_forms))
+        self.phrase_matcher = PhraseMatcher(phrase_symbols)
+        
+        self._build_duplicate_table()
         
-        # Create keyword -> quotes mapping for fast lookup
+        self._build_quote_candidates()
+    
+    def _build_quote_postings(self):
+        """Keyword and quote-word posting lists, needed only to build quote candidates."""
+        # Create keyword -> quote positions (posting lists) for fast lookup
         self.keyword_to_quotes = {}
-        for quote in self.quotes_db:
-            for keyword in quote.get("keywords", []):
-                keyword_lower = keyword.lower()
-                if keyword_lower not in self.keyword_to_quotes:
-                    self.keyword_to_quotes[keyword_lower] = []
-                self.keyword_to_quotes[keyword_lower].append(quote)
+        # Word-level inverted index over quote text for the text-contains fallback
+        self.quote_word_index = {}
+        for position in range(len(self.quote_texts)):
+            for keyword in json.loads(self.quote_records[position]).get("keywords", []):
+                postings = self.keyword_to_quotes.setdefault(keyword.lower(), [])
+                if not postings or postings[-1] != position:
+                    postings.append(position)
+            for word in set(QUOTE_WORD_RE.findall(self.quote_texts[position].lower())):
+                self.quote_word_index.setdefault(word, []).append(position)
+    
+    def _build_quote_candidates(self):
+        """
+        Materialize the quote candidates of every symbol, so a request only
+        reranks a short list by dream overlap. Candidates of all symbols are
+        stored back to back in three arrays; each symbol keeps its range.
+        """
+        self._build_quote_postings()
+        self.candidate_static_scores = array("B")
+        self.candidate_match_counts = array("B")
+        self.candidate_positions = array("I")
+        ranges = {}
+        all_quotes_range = None
+        for entry in self.dream_db:
+            candidate_range = ranges.get(entry.word)
+            if candidate_range is None:
+                candidates = self._quote_candidates(entry.word)
+                # Only the every-quote fallback has a static score of 0; store it once
+                is_all_quotes = bool(candidates) and candidates[0][0] == 0
+                if is_all_quotes and all_quotes_range is not None:
+                    candidate_range = all_quotes_range
+                else:
+                    start = len(self.candidate_positions)
+                    for static_score, match_count, position in candidates:
+                        self.candidate_static_scores.append(static_score)
+                        self.candidate_match_counts.append(match_count)
+                        self.candidate_positions.append(position)
+                    candidate_range = range(start, len(self.candidate_positions))
+                    if is_all_quotes:
+                        all_quotes_range = candidate_range
+                ranges[entry.word] = candidate_range
+            entry.quote_candidates = candidate_range
+        # The posting lists are rebuilt on demand by _quote_candidates
+        self.keyword_to_quotes = None
+        self.quote_word_index = None
+    
+    def _build_duplicate_table(self):
+        """
+        Precompute _are_symbols_duplicates for every pair of symbol words.
+        Each symbol key gets an ID and an adjacency bitset of its duplicates.
+        """
+        keys = []
+        self.symbol_key_ids = {}
+        for entry in self.dream_db:
+            key = entry.word.lower().strip()
+            if key not in self.symbol_key_ids:
+                self.symbol_key_ids[key] = len(keys)
+                keys.append(key)
+        
+        # Two symbols can only be duplicates if one is a substring of the
+        # other, they share a word, or one of them has no words at all
+        substring_ids = {}
+        word_ids = {}
+        wordless_ids = []
+        for key_id, key in enumerate(keys):
+            for start in range(len(key)):
+                for end in range(start + 1, len(key) + 1):
+                    substring_ids.setdefault(key[start:end], set()).add(key_id)
+            words = key.split()
+            if not words:
+                wordless_ids.append(key_id)
+            for word in words:
+                word_ids.setdefault(word, set()).add(key_id)
+        
+        self.duplicate_rows = [1 << key_id for key_id in range(len(keys))]
+        for key_id, key in enumerate(keys):
+            candidates = set(substring_ids.get(key, ()))
+            for word in set(key.split()):
+                candidates |= word_ids[word]
+            candidates.update(wordless_ids)
+            for other_id in candidates:
+                if self.duplicate_rows[key_id] >> other_id & 1:
+                    continue
+                if self._compute_symbols_duplicates(key, keys[other_id]):
+                    self.duplicate_rows[key_id] |= 1 << other_id
+                    self.duplicate_rows[other_id] |= 1 << key_id
+        
+        # The relation is symmetric, so wordless keys also pair with everything
+        all_ids = (1 << len(keys)) - 1
+        for key_id in wordless_ids:
+            self.duplicate_rows[key_id] = all_ids
+    
+    def _build_vocabulary(self):
+        """
+        Intern every token of the static texts (explanations, normalized
+        explanations and quotes) into integer IDs and store each explanation's
+        and quote's distinct token IDs as TokenRows, indexed by string table row.
+        """
+        explanations = list(self.explanation_texts)
+        normalized = list(self.normalized_texts)
+        text_tokens = {}
+        for text in explanations + normalized:
+            if text not in text_tokens:
+                text_tokens[text] = set(self._tokenize(text))
+        quote_tokens = [set(self._tokenize(text)) for text in self.quote_texts]
+        
+        # Most frequent tokens get the lowest IDs
+        frequency = Counter()
+        for tokens in text_tokens.values():
+            frequency.update(tokens)
+        for tokens in quote_tokens:
+            frequency.update(tokens)
+        ranked = sorted(frequency.items(), key=lambda item: (-item[1], item[0]))
+        self.vocabulary = {token: token_id for token_id, (token, _) in enumerate(ranked)}
+        
+        self.quote_tokens = TokenRows()
+        for tokens in quote_tokens:
+            self.quote_tokens.append(self._token_ids(tokens)[0])
+        self.explanation_tokens = TokenRows()
+        for text in explanations:
+            self.explanation_tokens.append(self._token_ids(text_tokens[text])[0])
+        self.normalized_tokens = TokenRows()
+        for text in normalized:
+            self.normalized_tokens.append(self._token_ids(text_tokens[text])[0])
+    
+    def _build_singular_forms(self):
+        """
+        Singular form of every word the index knows: symbol words, quote
+        keywords and the vocabulary of explanations and quotes. Dream tokens in
+        this lexicon are normalized by lookup, the same way the index was built.
+        """
+        words = list(self.vocabulary)
+        for symbol_word in self.symbol_words:
+            words.extend(fold(symbol_word).split())
+        for record in self.quote_records:
+            words.extend(keyword.lower() for keyword in json.loads(record).get("keywords", []))
+        self.singular_forms = {}
+        for word in words:
+            if word not in self.singular_forms:
+                singular = normalize_plural(word)
+                # Unchanged words map to their own key string
+                self.singular_forms[word] = word if singular == word else singular
+    
+    def _build_vector_scorer(self):
+        """Build the optional NumPy engine over the quote rows (row == quote position)."""
+        self.vector_scorer = None
+        if self.vector_scoring:
+            rows = [self.quote_tokens[row] for row in range(len(self.quote_tokens))]
+            self.vector_scorer = VectorScorer(rows, len(self.vocabulary))
+            self.vector_scorer.set_candidates(self.candidate_static_scores, self.candidate_match_counts,
+                                              self.candidate_positions)
+    
+    def _token_ids(self, tokens) -> Tuple[List[int], int]:
+        """Map distinct tokens to (vocabulary IDs, count of out-of-vocabulary tokens)."""
+        token_ids = []
+        oov_count = 0
+        for token in tokens:
+            token_id = self.vocabulary.get(token)
+            if token_id is None:
+                oov_count += 1
+            else:
+                token_ids.append(token_id)
+        return token_ids, oov_count
     
     def _tokenize(self, text: str) -> List[str]:
         """Tokenize text into words (lowercase, alphanumeric only)."""
-        # Extract words, convert to lowercase
-        tokens = re.findall(r'\b[a-zA-Z]+\b', text.lower())
-        # Filter out very short words (1-2 chars) and common stopwords that shouldn't count as symbols
-        stopwords = {'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'was', 'are', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'my', 'your', 'his', 'her', 'its', 'our', 'their', 'me', 'him', 'us', 'them'}
-        # Only keep meaningful words (3+ chars) that aren't stopwords
-        meaningful_tokens = [t for t in tokens if len(t) >= 3 and t not in stopwords]
-        return meaningful_tokens
+        return tokenize(text)
     
     def _calculate_token_overlap(self, text1: str, text2: str) -> float:
         """Calculate token overlap score between two texts."""
@@ -76,39 +606,26 @@ class DreamQuoteMatcher:
             return 0.0
         return len(intersection) / len(union)
     
+    def _ids_overlap(self, context: "MatchContext", token_ids: array) -> float:
+        """
+        Token overlap between the dream and an indexed text, given the text's
+        distinct token IDs (same as _calculate_token_overlap). The dream's
+        out-of-vocabulary tokens never occur in indexed text, so they only add
+        to the union.
+        """
+        if not token_ids or not context.token_set:
+            return 0.0
+        
+        # Jaccard similarity
+        intersection = len(context.id_set.intersection(token_ids))
+        return intersection / (len(token_ids) + len(context.token_set) - intersection)
+    
     def _normalize_plural(self, word: str) -> str:
         """Normalize word to handle plurals - returns singular form."""
         word_lower = word.lower()
-        
-        # Skip if too short
-        if len(word_lower) <= 2:
-            return word_lower
-        
-        # Common plural endings
-        if word_lower.endswith('ies') and len(word_lower) > 4:
-            # cities -> city, flies -> fly
-            return word_lower[:-3] + 'y'
-        elif word_lower.endswith('es') and len(word_lower) > 4:
-            # matches -> match, boxes -> box, buses -> bus
-            if word_lower.endswith('ches') or word_lower.endswith('shes') or word_lower.endswith('xes') or word_lower.endswith('zes'):
-                return word_lower[:-2]
-            elif word_lower.endswith('ves') and not word_lower.endswith('aves'):  # Don't convert "saves" -> "saf"
-                # leaves -> leaf, knives -> knife, but not "saves"
-                if word_lower.endswith('lves'):
-                    return word_lower[:-3] + 'f'  # leaves -> leaf
-                elif word_lower.endswith('ives'):
-                    return word_lower[:-3] + 'fe'  # knives -> knife
-                else:
-                    return word_lower[:-2]
-            else:
-                return word_lower[:-2]
-        elif word_lower.endswith('s') and len(word_lower) > 3:
-            # cars -> car, wasps -> wasp, but not "is", "as", "us"
-            # Don't remove 's' from words that end in 'ss' (like "class", "glass")
-            if not word_lower.endswith('ss'):
-                return word_lower[:-1]
-        
-        return word_lower
+        # Words of the index are looked up; suffix rules only run for other words
+        singular = self.singular_forms.get(word_lower)
+        return singular if singular is not None else normalize_plural(word_lower)
     
     def _words_match(self, word1: str, word2: str) -> bool:
         """Check if two words match, handling plurals and stems."""
@@ -139,6 +656,15 @@ class DreamQuoteMatcher:
     
     def _are_symbols_duplicates(self, symbol1: str, symbol2: str) -> bool:
         """Check if two symbols are variants/duplicates (e.g., 'Bed' and 'Bed Fellow', 'house' and 'housekeeper', 'fire' and 'firefighter')."""
+        # Look up the precomputed table for known symbols
+        id1 = self.symbol_key_ids.get(symbol1.lower().strip())
+        id2 = self.symbol_key_ids.get(symbol2.lower().strip())
+        if id1 is not None and id2 is not None:
+            return bool(self.duplicate_rows[id1] >> id2 & 1)
+        return self._compute_symbols_duplicates(symbol1, symbol2)
+    
+    def _compute_symbols_duplicates(self, symbol1: str, symbol2: str) -> bool:
+        """Evaluate the duplicate/variant rules for two symbols directly."""
         s1_lower = symbol1.lower().strip()
         s2_lower = symbol2.lower().strip()
         
@@ -191,7 +717,13 @@ class DreamQuoteMatcher:
         
         return False
     
-    def _find_dream_symbols(self, dream_text: str, max_symbols: int = 2, min_score: int = 200) -> List[Tuple[int, Dict, str]]:
+    def _context(self, dream) -> MatchContext:
+        """Return the MatchContext for a dream given as text or as an existing context."""
+        if isinstance(dream, MatchContext):
+            return dream
+        return MatchContext(self, dream)
+    
+    def _find_dream_symbols(self, dream: Union[str, MatchContext], max_symbols: int = 2, min_score: int = 200) -> List[Tuple[int, DreamSymbol, str]]:
         """
         Find up to max_symbols dream symbols from the dream text.
         STRICT MATCHING ONLY: Only matches symbols whose keyword appears as a whole word in user's text.
@@ -201,91 +733,53 @@ class DreamQuoteMatcher:
         - For multi-word phrases, ALL words must appear as whole words
         Returns list of (score, entry, matched_token) tuples.
         """
-        # Tokenize user's dream text - get set of actual words
-        dream_tokens = self._tokenize(dream_text)
-        dream_tokens_set = set(dream_tokens)
-        # Create normalized set for plural/singular matching
-        dream_tokens_normalized = {self._normalize_plural(t) for t in dream_tokens}
+        # Tokenized user's dream text - list and set of actual words,
+        # each token normalized once for plural/singular matching
+        context = self._context(dream)
+        dream_tokens = context.tokens
+        dream_tokens_set = context.token_set
+        dream_forms = context.forms
         
         # Find STRICT matches only - symbol word must appear as whole word in user text
-        strict_matches = []
-        for entry in self.dream_db:
-            symbol_word = entry["word"].lower()
-            symbol_word_normalized = self._normalize_plural(symbol_word)
-            matched_token = None
-            score = 0
-            
-            # Rule A: STRICT match - symbol word must appear as whole word in user's text
-            # Check if it's a single word or multi-word phrase
-            symbol_words = symbol_word.split()
-            
-            if len(symbol_words) == 1:
-                # Single word symbol - must match exactly or as plural/singular
-                if symbol_word in dream_tokens_set:
-                    score = 1000 + len(symbol_word)
-                    matched_token = symbol_word
-                else:
-                    # Check plural/singular variations (still whole word matching)
-                    for token in dream_tokens:
-                        token_normalized = self._normalize_plural(token)
-                        # Exact match after normalization
-                        if (token == symbol_word or 
-                            token_normalized == symbol_word_normalized or
-                            token == symbol_word_normalized or
-                            token_normalized == symbol_word):
-                            score = 950 + len(symbol_word)
-                            matched_token = token
-                            break
-            else:
-                # Multi-word phrase - ALL words must appear as whole words
-                # Filter out stopwords from symbol phrase
-                stopwords = {'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-                meaningful_symbol_words = [sw.lower() for sw in symbol_words if len(sw) >= 3 and sw.lower() not in stopwords]
-                
-                if len(meaningful_symbol_words) > 0:
-                    # ALL meaningful words must appear as whole words in user's text
-                    matched_tokens = []
-                    all_matched = True
-                    
-                    for sw in meaningful_symbol_words:
-                        sw_normalized = self._normalize_plural(sw)
-                        found = False
-                        
-                        # Check exact match first
-                        if sw in dream_tokens_set:
-                            matched_tokens.append(sw)
-                            found = True
-                        else:
-                            # Check normalized (plural/singular) match
-                            for token in dream_tokens:
-                                token_normalized = self._normalize_plural(token)
-                                if sw_normalized == token_normalized or sw == token_normalized or sw_normalized == token:
-                                    matched_tokens.append(token)
-                                    found = True
-                                    break
-                        
-                        if not found:
-                            all_matched = False
-                            break
-                    
-                    # Only score if ALL meaningful words were matched as whole words
-                    if all_matched and len(matched_tokens) == len(meaningful_symbol_words):
-                        score = 500 + len(symbol_word)
-                        matched_token = " ".join(matched_tokens)
-            
-            # Only include if we have a strict match (score > 0 and matched_token)
-            if score > 0 and matched_token:
-                strict_matches.append((score, entry, matched_token))
+        # position in dream_db -> (score, matched_token)
+        matches = {}
+        
+        # Single word symbol - must match exactly or as plural/singular
+        for token in dream_tokens_set:
+            for position in self.symbol_exact_index.get(token, ()):
+                matches[position] = (1000 + len(token), token)
+        # Check plural/singular variations (still whole word matching);
+        # the earliest matching token in the dream wins
+        for forms in dream_forms:
+            token = forms[0]
+            for form in forms:
+                for position in self.symbol_form_index.get(form, ()):
+                    if position not in matches:
+                        matches[position] = (950 + len(self.symbol_words[position]), token)
+        
+        # Multi-word phrase - ALL meaningful words must appear as whole words
+        phrase_hits = self.phrase_matcher.scan(dream_forms, strict=self.strict_phrases)
+        if self.longest_phrases:
+            phrase_hits = select_longest(phrase_hits)
+        for position, start, end, token_positions in phrase_hits:
+            matched_token = " ".join(dream_tokens[i] for i in token_positions)
+            matches[position] = (500 + len(self.symbol_words[position]), matched_token)
         
-        # Sort by score (descending), then by word length (longer first)
-        strict_matches.sort(key=lambda x: (-x[0], -len(x[1]["word"])))
+        strict_matches = [
+            (score, self.dream_db[position], matched_token)
+            for position, (score, matched_token) in matches.items()
+        ]
+        
+        # Rank by score (descending), then by word length (longer first), then
+        # database order; the loop below usually stops after a few symbols
+        ranked_matches = iter_ranked(strict_matches, key=lambda x: (-x[0], -len(x[1].word), x[1].position))
         
         # Remove duplicates/variants - keep the highest scoring one
         filtered_symbols = []
-        for score, entry, matched_token in strict_matches:
+        for score, entry, matched_token in ranked_matches:
             is_duplicate = False
             for i, (existing_score, existing_entry, existing_token) in enumerate(filtered_symbols):
-                if self._are_symbols_duplicates(entry["word"], existing_entry["word"]):
+                if self._are_symbols_duplicates(entry.word, existing_entry.word):
                     is_duplicate = True
                     # Keep the one with higher score
                     if score > existing_score:
@@ -301,30 +795,95 @@ class DreamQuoteMatcher:
         
         return filtered_symbols
     
-    def _choose_best_explanation(self, symbol: Dict, dream_text: str) -> str:
+    def _symbol_explanations(self, symbol: DreamSymbol) -> List[str]:
+        """All explanations of a symbol, decoded from the string table."""
+        return [self.explanation_texts[row] for row in symbol.explanation_rows]
+    
+    def _explanation_rows(self, symbol: DreamSymbol) -> Tuple[range, TokenRows, array, StringTable]:
+        """
+        The symbol's explanation rows in the active output mode, with the
+        column's token IDs, lengths and texts. Entries without normalized
+        explanations fall back to their original ones.
+        """
+        if self.normalized_explanations and symbol.normalized_rows:
+            return symbol.normalized_rows, self.normalized_tokens, self.normalized_lengths, self.normalized_texts
+        return symbol.explanation_rows, self.explanation_tokens, self.explanation_lengths, self.explanation_texts
+    
+    def _choose_best_explanation(self, symbol: DreamSymbol, dream: Union[str, MatchContext]) -> str:
         """Choose the best explanation for a symbol based on token overlap with dream."""
-        explanations = symbol.get("explanations", [])
-        if not explanations:
-            return ""
+        best = self._rank_explanations(symbol, dream)
+        # Only the chosen explanation is decoded
+        return self._explanation_rows(symbol)[3][best[0]] if best else ""
+    
+    def _rank_explanations(self, symbol: DreamSymbol, dream: Union[str, MatchContext],
+                           k: Optional[int] = 1) -> List[int]:
+        """Rows of the symbol's k best explanations for a dream, best first (k=None ranks them all)."""
+        rows, tokens, lengths, texts = self._explanation_rows(symbol)
         
-        # Calculate overlap score for each explanation
+        # Calculate overlap score for each explanation row
+        context = self._context(dream)
         scored_explanations = []
-        for exp in explanations:
-            score = self._calculate_token_overlap(dream_text, exp)
-            scored_explanations.append((score, exp))
+        for row in rows:
+            score = self._ids_overlap(context, tokens[row])
+            scored_explanations.append((score, row))
         
-        # Sort by score (descending), then by length (shorter first for tie-breaking)
-        scored_explanations.sort(key=lambda x: (-x[0], len(x[1])))
+        # Rank by score (descending), then by length (shorter first for tie-breaking)
+        return [row for _, row in top_k(scored_explanations, key=lambda x: (-x[0], lengths[x[1]]), k=k)]
+    
+    def _choose_best_explanations(self, symbol: DreamSymbol, contexts: List[MatchContext]) -> List[str]:
+        """_choose_best_explanation for one symbol and many dreams."""
+        rows, tokens, lengths, texts = self._explanation_rows(symbol)
+        if not rows:
+            return ["" for _ in contexts]
         
-        return scored_explanations[0][1] if scored_explanations else explanations[0]
+        # Look up the explanations' token IDs and lengths once for the whole group
+        indexed = [(tokens[row], lengths[row], row) for row in rows]
+        chosen_rows = []
+        for context in contexts:
+            scored_explanations = [
+                (self._ids_overlap(context, token_ids), length, row)
+                for token_ids, length, row in indexed
+            ]
+            # Best by score (descending), then by length (shorter first for tie-breaking)
+            chosen_rows.append(top_k(scored_explanations, key=lambda x: (-x[0], x[1]))[0][2])
+        # Decode each chosen explanation once
+        decoded = {row: texts[row] for row in set(chosen_rows)}
+        return [decoded[row] for row in chosen_rows]
+    
+    def _quote(self, position: int) -> Dict:
+        """Quote object at a position, decoded from the string tables."""
+        quote = json.loads(self.quote_records[position])
+        if "quote" in quote:
+            quote["quote"] = self.quote_texts[position]
+        return quote
     
     def _quote_contains_symbol(self, quote: Dict, symbol_word: str) -> bool:
         """Check if quote text contains the symbol word."""
-        quote_text = quote.get("quote", "").lower()
+        return self._text_contains_symbol(quote.get("quote", ""), symbol_word)
+    
+    def _text_contains_symbol(self, text: str, symbol_word: str) -> bool:
+        """Check if text contains the symbol word."""
+        quote_text = text.lower()
         symbol_lower = symbol_word.lower()
         # Check for exact word match (word boundaries)
         return bool(re.search(r'\b' + re.escape(symbol_lower) + r'\b', quote_text))
     
+    def _quotes_containing_symbol(self, symbol_word: str) -> set:
+        """Positions of quotes whose text contains the symbol word (see _quote_contains_symbol)."""
+        if self.quote_word_index is None:
+            self._build_quote_postings()
+        # A whole-word match implies every word of the symbol is a word of the
+        # quote, so intersect their posting lists before running the regex
+        words = QUOTE_WORD_RE.findall(symbol_word.lower())
+        if words:
+            candidates = set(self.quote_word_index.get(words[0], []))
+            for word in words[1:]:
+                candidates.intersection_update(self.quote_word_index.get(word, []))
+        else:
+            candidates = range(len(self.quote_texts))
+        return {position for position in candidates
+                if self._text_contains_symbol(self.quote_texts[position], symbol_word)}
+    
     def _calculate_keyword_overlap(self, quote: Dict, symbol_word: str) -> float:
         """Calculate keyword overlap score between quote and symbol."""
         quote_keywords = [k.lower() for k in quote.get("keywords", [])]
@@ -381,95 +940,150 @@ class DreamQuoteMatcher:
         
         return matches_both, matches_one, match_count
     
-    def _choose_best_quote(self, symbol: Dict, dream_text: str) -> Optional[Dict]:
+    def _quote_candidates(self, symbol_word: str) -> List[Tuple[int, int, int]]:
         """
-        Choose the best quote for a symbol based on keyword matching.
-        Prefers quotes matching BOTH keywords, then ONE keyword.
-        Always returns deterministically.
+        Candidate quotes for a symbol with their dream-independent scores.
+        Returns (static_score, match_count, quote_position) tuples in corpus order,
+        keeping only quotes that can still win after the dream-overlap bonus.
         """
-        symbol_word = symbol["word"]
         symbol_keywords = self._get_symbol_keywords(symbol_word)
         
         if not symbol_keywords:
-            return None
+            return []
         
-        # Separate quotes into categories
-        quotes_both = []  # Quotes matching both keywords
-        quotes_one = []   # Quotes matching one keyword
-        quotes_none = []  # Quotes matching neither (fallback)
+        if self.keyword_to_quotes is None:
+            self._build_quote_postings()
+        # Gather candidates from the keyword posting lists:
+        # prefer quotes matching BOTH keywords, then ONE keyword
+        keyword1 = symbol_keywords[0]
+        keyword2 = symbol_keywords[1] if len(symbol_keywords) > 1 else None
+        postings1 = self.keyword_to_quotes.get(keyword1, [])
+        postings2 = self.keyword_to_quotes.get(keyword2, []) if keyword2 and keyword2 != keyword1 else []
         
-        for quote in self.quotes_db:
-            matches_both, matches_one, match_count = self._quote_matches_keywords(quote, symbol_keywords)
-            
-            if matches_both:
-                quotes_both.append((match_count, quote))
-            elif matches_one:
-                quotes_one.append((match_count, quote))
-            else:
-                # Check if symbol word appears in quote text as fallback
-                if self._quote_contains_symbol(quote, symbol_word):
-                    quotes_none.append((0, quote))
-        
-        # Prefer quotes matching both keywords
+        quotes_both = sorted(set(postings1).intersection(postings2)) if postings1 and postings2 else []
+        symbol_quotes = self._quotes_containing_symbol(symbol_word)
         if quotes_both:
-            candidate_quotes = quotes_both
-        elif quotes_one:
-            candidate_quotes = quotes_one
+            candidate_quotes = [(2, position) for position in quotes_both]
+        elif postings1 or postings2:
+            candidate_quotes = [(1, position) for position in sorted(set(postings1).union(postings2))]
+        elif symbol_quotes:
+            # Fallback: quotes whose text contains the symbol word
+            candidate_quotes = [(0, position) for position in sorted(symbol_quotes)]
         else:
-            candidate_quotes = quotes_none if quotes_none else [(0, q) for q in self.quotes_db]
+            # No quote scores anything before dream overlap: every quote is a candidate
+            return [(0, 0, position) for position in range(len(self.quote_texts))]
         
-        # Score each candidate quote for deterministic selection
         scored_quotes = []
-        for match_count, quote in candidate_quotes:
+        for match_count, position in candidate_quotes:
             # Calculate additional scores for tie-breaking
             keyword_score = match_count * 10  # Higher for more keyword matches
             
             # Check if symbol word appears in quote text
-            text_match = 5 if self._quote_contains_symbol(quote, symbol_word) else 0
+            text_match = 5 if position in symbol_quotes else 0
             
-            # Token overlap with dream text (smaller weight)
-            dream_overlap = self._calculate_token_overlap(dream_text, quote.get("quote", "")) * 2
+            scored_quotes.append((keyword_score + text_match, match_count, position))
+        
+        # Dream overlap adds at most QUOTE_OVERLAP_WEIGHT, so quotes further
+        # behind the best static score can never win (ties are kept)
+        best_static = max(static_score for static_score, _, _ in scored_quotes)
+        return [candidate for candidate in scored_quotes
+                if candidate[0] >= best_static - QUOTE_OVERLAP_WEIGHT]
+    
+    def _choose_best_quote(self, symbol: DreamSymbol, dream: Union[str, MatchContext]) -> Optional[Dict]:
+        """
+        Choose the best quote for a symbol based on keyword matching.
+        Prefers quotes matching BOTH keywords, then ONE keyword.
+        Always returns deterministically.
+        """
+        # Rerank the candidates by token overlap with dream text (smaller weight)
+        context = self._context(dream)
+        if self.vector_scorer is not None and len(symbol.quote_candidates) >= VECTOR_MIN_CANDIDATES:
+            return self._choose_best_quote_vectorized(context, symbol.quote_candidates)
+        
+        best = self._rank_quotes(symbol, context)
+        # Only the chosen quote is decoded
+        return self._quote(best[0]) if best else None
+    
+    def _rank_quotes(self, symbol: DreamSymbol, dream: Union[str, MatchContext],
+                     k: Optional[int] = 1) -> List[int]:
+        """Positions of the symbol's k best candidate quotes for a dream, best first (k=None ranks them all)."""
+        candidates = symbol.quote_candidates
+        context = self._context(dream)
+        scored_quotes = []
+        for candidate in candidates:
+            position = self.candidate_positions[candidate]
+            dream_overlap = self._ids_overlap(context, self.quote_tokens[position]) * QUOTE_OVERLAP_WEIGHT
             
             # Combined score
-            combined_score = keyword_score + text_match + dream_overlap
+            combined_score = self.candidate_static_scores[candidate] + dream_overlap
             
-            scored_quotes.append((combined_score, match_count, quote))
+            scored_quotes.append((combined_score, self.candidate_match_counts[candidate], position))
+        
+        # Rank deterministically: by combined score, then match count, then quote text.
+        # For symbols without keyword or text matches every quote is a candidate,
+        # so only the k best are ordered
+        ranked = top_k(scored_quotes, key=lambda x: (-x[0], -x[1], self.quote_text_ranks[x[2]]), k=k)
+        return [position for _, _, position in ranked]
+    
+    def _choose_best_quotes(self, symbol: DreamSymbol, contexts: List[MatchContext]) -> List[Optional[Dict]]:
+        """_choose_best_quote for one symbol and many dreams."""
+        candidates = symbol.quote_candidates
+        if not candidates:
+            return [None for _ in contexts]
         
-        # Sort deterministically: by combined score, then match count, then quote text
-        scored_quotes.sort(key=lambda x: (-x[0], -x[1], x[2].get("quote", "")))
+        if self.vector_scorer is not None and len(candidates) * len(contexts) >= VECTOR_MIN_CANDIDATES:
+            return self._choose_best_quotes_vectorized(contexts, candidates)
         
-        return scored_quotes[0][2] if scored_quotes else None
+        # Look up the candidates once for the whole group
+        indexed = []
+        for candidate in candidates:
+            position = self.candidate_positions[candidate]
+            indexed.append((self.candidate_static_scores[candidate], self.candidate_match_counts[candidate],
+                            self.quote_tokens[position], self.quote_text_ranks[position], position))
+        chosen = []
+        for context in contexts:
+            scored_quotes = [
+                (static_score + self._ids_overlap(context, token_ids) * QUOTE_OVERLAP_WEIGHT, match_count, text_rank, position)
+                for static_score, match_count, token_ids, text_rank, position in indexed
+            ]
+            # Best deterministically: by combined score, then match count, then quote text
+            chosen.append(top_k(scored_quotes, key=lambda x: (-x[0], -x[1], x[2]))[0][3])
+        return [self._quote(position) for position in chosen]
     
-    def match(self, dream_text: str) -> Dict:
-        """
-        Match dream text to symbols and quotes.
+    def _choose_best_quote_vectorized(self, context: MatchContext, candidates: range) -> Optional[Dict]:
+        """Same ranking as _choose_best_quote, scoring all candidates in one NumPy pass."""
+        return self._choose_best_quotes_vectorized([context], candidates)[0]
+    
+    def _choose_best_quotes_vectorized(self, contexts: List[MatchContext], candidates: range) -> List[Optional[Dict]]:
+        """Same ranking as _choose_best_quote for many dreams, scoring all candidates in NumPy."""
+        static_scores, match_counts, positions = self.vector_scorer.candidates(candidates)
+        overlaps = self.vector_scorer.overlaps_many(
+            [(context.token_ids, context.oov_count) for context in contexts], positions)
         
-        Returns:
-            {
-                "symbols": [
-                    {
-                        "word": "Symbol",
-                        "explanation": "Best explanation text",
-                        "quote": {quote object}
-                    }
-                ],
-                "message": "Optional message for user guidance",
-                "show_freud_only": bool  # If True, show only Freud section
-            }
-        """
+        chosen = []
+        for dream_overlaps in overlaps:
+            combined_scores = static_scores + dream_overlaps * QUOTE_OVERLAP_WEIGHT
+            # Break ties like _rank_quotes: match count, then quote text, then corpus order
+            tied = (combined_scores == combined_scores.max()).nonzero()[0]
+            best = min(tied, key=lambda i: (-match_counts[i], self.quote_text_ranks[positions[i]], i))
+            chosen.append(self._quote(positions[best]))
+        return chosen
+    
+    def _select_symbols(self, context: MatchContext) -> List[DreamSymbol]:
+        """Matched symbols for a dream: no duplicates, each using UNIQUE words from user's input."""
         # Find matching symbols with minimum score threshold
-        matched_symbols_with_scores = self._find_dream_symbols(dream_text, max_symbols=10, min_score=200)
+        matched_symbols_with_scores = self._find_dream_symbols(context, max_symbols=10, min_score=200)
         
         # Filter out duplicates and ensure each symbol uses a UNIQUE word from user's input
-        # Track which tokens from user's input have been used
-        used_tokens = set()
+        # Track which tokens (normalized) from user's input have been used
+        used_tokens_normalized = set()
         filtered_symbols = []
         
         for score, entry, matched_token in matched_symbols_with_scores:
             # Check if this symbol is a duplicate of an existing one
             is_duplicate = False
             for existing_entry in filtered_symbols:
-                if self._are_symbols_duplicates(entry["word"], existing_entry["word"]):
+                if self._are_symbols_duplicates(entry.word, existing_entry.word):
                     is_duplicate = True
                     break
             
@@ -481,9 +1095,8 @@ class DreamQuoteMatcher:
             matched_tokens_list = matched_token.split() if matched_token else []
             token_already_used = False
             
-            # Normalize tokens for comparison
-            matched_tokens_normalized = {self._normalize_plural(t) for t in matched_tokens_list}
-            used_tokens_normalized = {self._normalize_plural(t) for t in used_tokens}
+            # Normalize tokens for comparison (matched tokens are dream tokens)
+            matched_tokens_normalized = {context.singular[t] for t in matched_tokens_list}
             
             # Check if any matched token overlaps with already used tokens
             if matched_tokens_normalized & used_tokens_normalized:
@@ -491,14 +1104,28 @@ class DreamQuoteMatcher:
             
             if not token_already_used:
                 # Mark these tokens as used
-                for token in matched_tokens_list:
-                    used_tokens.add(token.lower())
+                used_tokens_normalized |= matched_tokens_normalized
                 filtered_symbols.append(entry)
             
             # Stop once we have enough non-duplicate symbols with unique tokens
             if len(filtered_symbols) >= 10:
                 break
         
+        return filtered_symbols
+    
+    def _shown_symbols(self, filtered_symbols: List[DreamSymbol]) -> List[DreamSymbol]:
+        """Symbols included in the result: all of them if fewer than 2, else the first 2."""
+        if len(filtered_symbols) < 2:
+            # Still include the symbol(s) for Dream Yield display if any found
+            return filtered_symbols
+        # Exactly 2 or more symbols found - use the first 2 non-duplicate ones
+        return filtered_symbols[:2]
+    
+    def _build_result(self, filtered_symbols: List[DreamSymbol], interpretations: List[Tuple[str, Optional[Dict]]]) -> Dict:
+        """
+        Build the match() result from the filtered symbols and the
+        (explanation, quote) chosen for each shown symbol.
+        """
         # REQUIRE exactly 2 matches - if not, show Freud asking for more details
         results = []
         message = None
@@ -508,50 +1135,148 @@ class DreamQuoteMatcher:
             # Less than 2 symbols found - show only Freud with guidance message
             show_freud_only = True
             message = "Please add more details about your dream. What else did you see or feel?"
+        
+        for symbol, (best_explanation, best_quote) in zip(self._shown_symbols(filtered_symbols), interpretations):
+            # Get book and emoji from symbol entry
+            book = self.book_names[self.book_ids[symbol.position]]
+            emoji = self.emoji_names[self.emoji_ids[symbol.position]]
             
-            # Still include the symbol(s) for Dream Yield display if any found
-            for symbol in filtered_symbols:
-                best_explanation = self._choose_best_explanation(symbol, dream_text)
-                best_quote = self._choose_best_quote(symbol, dream_text)
-                
-                # Get book and emoji from symbol entry
-                book = symbol.get("book")
-                emoji = symbol.get("emoji")
-                
-                results.append({
-                    "word": symbol["word"],
-                    "explanation": best_explanation,
-                    "quote": best_quote,
-                    "book": book,
-                    "emoji": emoji
-                })
-        else:
-            # Exactly 2 or more symbols found - use the first 2 non-duplicate ones
-            selected_symbols = filtered_symbols[:2]
-            
-            # Two symbols found - normal interpretation
-            for symbol in selected_symbols:
-                best_explanation = self._choose_best_explanation(symbol, dream_text)
-                best_quote = self._choose_best_quote(symbol, dream_text)
-                
-                # Get book and emoji from symbol entry
-                book = symbol.get("book")
-                emoji = symbol.get("emoji")
-                
-                results.append({
-                    "word": symbol["word"],
-                    "explanation": best_explanation,
-                    "quote": best_quote,
-                    "book": book,
-                    "emoji": emoji
-                })
+            results.append({
+                "word": symbol.word,
+                "explanation": best_explanation,
+                "quote": best_quote,
+                "book": book,
+                "emoji": emoji
+            })
         
         return {
             "symbols": results,
             "message": message,
             "show_freud_only": show_freud_only
         }
-
+    
+    def match(self, dream_text: str) -> Dict:
+        """
+        Match dream text to symbols and quotes.
+        
+        Returns:
+            {
+                "symbols": [
+                    {
+                        "word": "Symbol",
+                        "explanation": "Best explanation text",
+                        "quote": {quote object}
+                    }
+                ],
+                "message": "Optional message for user guidance",
+                "show_freud_only": bool  # If True, show only Freud section
+            }
+        """
+        # Tokenize the dream once for every stage below
+        context = MatchContext(self, dream_text)
+        
+        # Dreams with the same tokens have the same result
+        version = self._result_version()
+        result = self._cached_result(context.signature, version)
+        if result is not None:
+            return result
+        
+        result = self._match_context(context)
+        self._store_result(context.signature, version, result)
+        return result
+    
+    def _cached_result(self, signature: Tuple, version: Tuple) -> Optional[Dict]:
+        """Result from the memory cache, else from the persistent cache, else None."""
+        if self.result_cache is not None:
+            result = self.result_cache.get(signature, version)
+            if result is not None:
+                return result
+        if self.persistent_cache is not None:
+            result = self.persistent_cache.get(signature, version)
+            if result is not None:
+                if self.result_cache is not None:
+                    self.result_cache.put(signature, version, result)
+                return result
+        return None
+    
+    def _store_result(self, signature: Tuple, version: Tuple, result: Dict):
+        """Store a new result in both caches."""
+        if self.result_cache is not None:
+            self.result_cache.put(signature, version, result)
+        if self.persistent_cache is not None:
+            self.persistent_cache.put(signature, version, result)
+    
+    def _result_version(self) -> Tuple:
+        """Everything besides the dream's tokens that match() results depend on."""
+        return (MATCHER_VERSION, SNAPSHOT_VERSION, self.db_version,
+                self.strict_phrases, self.longest_phrases, self.normalized_explanations)
+    
+    def _match_context(self, context: MatchContext) -> Dict:
+        """Run the matching pipeline for a tokenized dream."""
+        filtered_symbols = self._select_symbols(context)
+        interpretations = [
+            (self._choose_best_explanation(symbol, context), self._choose_best_quote(symbol, context))
+            for symbol in self._shown_symbols(filtered_symbols)
+        ]
+        return self._build_result(filtered_symbols, interpretations)
+    
+    def match_many(self, dreams: Iterable[str]) -> List[Dict]:
+        """
+        Match many dream texts at once. Returns one result per dream, in order,
+        identical to calling match() on each.
+        Dreams with the same tokens are matched once, and each symbol's
+        explanation and quote candidates are scored for all its dreams together.
+        """
+        # Tokenize every dream in one pass, sharing work between equivalent inputs
+        contexts = {}
+        signatures = []
+        for dream_text in dreams:
+            context = MatchContext(self, dream_text)
+            signatures.append(context.signature)
+            contexts.setdefault(context.signature, context)
+        
+        # Take what the result caches already have
+        version = self._result_version()
+        cached = {}
+        for signature in contexts:
+            result = self._cached_result(signature, version)
+            if result is not None:
+                cached[signature] = result
+        for signature in cached:
+            del contexts[signature]
+        
+        # Symbol lookups for the whole batch
+        selected = {signature: self._select_symbols(context) for signature, context in contexts.items()}
+        
+        # Group dreams by shown symbol
+        groups = {}
+        for signature, filtered_symbols in selected.items():
+            for symbol in self._shown_symbols(filtered_symbols):
+                groups.setdefault(id(symbol), (symbol, []))[1].append(signature)
+        
+        interpretations = {}
+        for symbol, group in groups.values():
+            group_contexts = [contexts[signature] for signature in group]
+            explanations = self._choose_best_explanations(symbol, group_contexts)
+            quotes = self._choose_best_quotes(symbol, group_contexts)
+            for signature, explanation, quote in zip(group, explanations, quotes):
+                interpretations[(signature, id(symbol))] = (explanation, quote)
+        
+        results = []
+        stored = set()
+        for signature in signatures:
+            if signature in cached:
+                results.append(cached[signature])
+                continue
+            results.append(self._build_result(selected[signature], [
+                interpretations[(signature, id(symbol))]
+                for symbol in self._shown_symbols(selected[signature])
+            ]))
+            # Store each new result once
+            if signature not in stored:
+                self._store_result(signature, version, results[-1])
+                stored.add(signature)
+        return results
 
 def main():
     """Test the matcher with example dreams."""
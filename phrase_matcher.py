@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Token-level phrase matcher for multi-word dream symbols (e.g. "Bed Fellow").
+The phrase vocabulary is compiled once into posting lists and a trie keyed by
+surface forms, so a tokenized dream is scanned once instead of checking
+every phrase against every token.
+"""
+
+from typing import List, Tuple, Iterable
+
+# A phrase word matches a dream token when their surface forms intersect:
+# {word, singular(word)} & {token, singular(token)}
+
+# Hit: (phrase_id, start, end, positions) - positions are the dream token
+# indexes matched by each meaningful phrase word, in phrase order
+PhraseHit = Tuple[int, int, int, Tuple[int, ...]]
+
+
+class PhraseMatcher:
+    def __init__(self, phrases: Iterable[Tuple[int, List[Tuple[str, str]]]]):
+        """
+        Compile phrases into an automaton.
+        phrases: (phrase_id, [(word, normalized_word), ...]) for each phrase,
+        listing only its meaningful words.
+        """
+        self.phrases = []
+        # Unordered mode: surface form -> [(phrase_index, slot_index)]
+        self.slot_postings = {}
+        # Strict-adjacency mode: trie over surface forms, node 0 is the root
+        self.trie_children = [{}]
+        self.trie_outputs = [[]]
+
+        for phrase_id, slots in phrases:
+            phrase_index = len(self.phrases)
+            slot_words = [word for word, normalized in slots]
+            self.phrases.append((phrase_id, slot_words))
+            for slot_index, (word, normalized) in enumerate(slots):
+                for form in {word, normalized}:
+                    self.slot_postings.setdefault(form, []).append((phrase_index, slot_index))
+
+            # Insert every combination of slot forms so a walk only needs
+            # exact transitions
+            nodes = {0}
+            for word, normalized in slots:
+                next_nodes = set()
+                for node in nodes:
+                    for form in {word, normalized}:
+                        child = self.trie_children[node].get(form)
+                        if child is None:
+                            child = len(self.trie_children)
+                            self.trie_children.append({})
+                            self.trie_outputs.append([])
+                            self.trie_children[node][form] = child
+                        next_nodes.add(child)
+                nodes = next_nodes
+            for node in nodes:
+                self.trie_outputs[node].append(phrase_index)
+
+    def scan(self, dream_forms: List[Tuple[str, str]], strict: bool = False) -> List[PhraseHit]:
+        """
+        Scan the tokenized dream once and return every phrase hit.
+        dream_forms: (token, normalized_token) for each dream token, in order.
+
+        By default the phrase words may appear anywhere in the dream, in any
+        order; an exact token wins over a plural/singular variant, then the
+        earliest token wins. With strict=True the words must be adjacent
+        tokens in phrase order.
+        """
+        if strict:
+            return self._scan_adjacent(dream_forms)
+        return self._scan_unordered(dream_forms)
+
+    def _scan_unordered(self, dream_forms: List[Tuple[str, str]]) -> List[PhraseHit]:
+        # (phrase_index, slot_index) -> (is_variant, position); lower is better
+        best = {}
+        for position, (token, normalized) in enumerate(dream_forms):
+            for form in {token, normalized}:
+                for phrase_index, slot_index in self.slot_postings.get(form, ()):
+                    is_variant = token != self.phrases[phrase_index][1][slot_index]
+                    key = (phrase_index, slot_index)
+                    current = best.get(key)
+                    if current is None or (is_variant, position) < current:
+                        best[key] = (is_variant, position)
+
+        matched_slots = {}
+        for phrase_index, slot_index in best:
+            matched_slots[phrase_index] = matched_slots.get(phrase_index, 0) + 1
+
+        hits = []
+        for phrase_index, count in matched_slots.items():
+            phrase_id, slot_words = self.phrases[phrase_index]
+            # ALL meaningful words must be matched
+            if count < len(slot_words):
+                continue
+            positions = tuple(best[(phrase_index, i)][1] for i in range(len(slot_words)))
+            hits.append((phrase_id, min(positions), max(positions), positions))
+        hits.sort()
+        return hits
+
+    def _scan_adjacent(self, dream_forms: List[Tuple[str, str]]) -> List[PhraseHit]:
+        hits = []
+        active = set()
+        for position, (token, normalized) in enumerate(dream_forms):
+            next_active = set()
+            # Every token may also start a new phrase at the root
+            for node in active | {0}:
+                children = self.trie_children[node]
+                for form in {token, normalized}:
+                    child = children.get(form)
+                    if child is not None:
+                        next_active.add(child)
+            for node in next_active:
+                for phrase_index in self.trie_outputs[node]:
+                    phrase_id, slot_words = self.phrases[phrase_index]
+                    start = position - len(slot_words) + 1
+                    hits.append((phrase_id, start, position, tuple(range(start, position + 1))))
+            active = next_active
+        hits.sort()
+        return hits
+
+
+def select_longest(hits: List[PhraseHit]) -> List[PhraseHit]:
+    """
+    Keep the longest non-overlapping hits (leftmost first on equal length).
+    Two hits overlap when they use the same dream token.
+    """
+    chosen = []
+    used_positions = set()
+    for hit in sorted(hits, key=lambda h: (-len(h[3]), h[1], h[0])):
+        if used_positions.isdisjoint(hit[3]):
+            chosen.append(hit)
+            used_positions.update(hit[3])
+    chosen.sort()
+    return chosen
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Caches of match() results.
+match() output depends only on the dream's token sequence, so results are
+cached by that signature. ResultCache is a bounded, thread-safe in-memory
+LRU; PersistentResultCache keeps results in SQLite so they survive restarts.
+Results are stored serialized: the stored size is exact for memory-based
+eviction, and every hit returns a fresh copy the caller may modify.
+"""
+
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Hashable, Optional
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None):
+        """
+        max_entries: most results kept.
+        max_bytes: most serialized result bytes kept (None for no limit).
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # signature -> UTF-8 serialized result, least recently used first
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        # Version of the index the cached results were computed with
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, signature: Hashable, version: Hashable) -> Optional[Dict]:
+        """Cached result for a signature, or None. A new version invalidates every entry."""
+        with self.lock:
+            if version != self.version:
+                self._reset(version)
+            serialized = self.entries.get(signature)
+            if serialized is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(signature)
+            self.hits += 1
+        return json.loads(serialized)
+
+    def put(self, signature: Hashable, version: Hashable, result: Dict):
+        """Store a result computed with the given index version."""
+        serialized = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        if self.max_bytes is not None and len(serialized) > self.max_bytes:
+            return
+        with self.lock:
+            if version != self.version:
+                self._reset(version)
+            previous = self.entries.pop(signature, None)
+            if previous is not None:
+                self.total_bytes -= len(previous)
+            self.entries[signature] = serialized
+            self.total_bytes += len(serialized)
+            # Evict least recently used results until both limits hold
+            while len(self.entries) > self.max_entries or (
+                    self.max_bytes is not None and self.total_bytes > self.max_bytes):
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every cached result."""
+        with self.lock:
+            self._reset(self.version)
+
+    def _reset(self, version: Hashable):
+        self.entries.clear()
+        self.total_bytes = 0
+        self.version = version
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+            }
+
+
+class PersistentResultCache:
+    def __init__(self, path: Path, max_entries: int = 100000, ttl: float = 30 * 24 * 3600,
+                 flush_interval: float = 1.0, batch_size: int = 256):
+        """
+        path: SQLite database file (created if missing).
+        max_entries: most results kept; the oldest are pruned first.
+        ttl: seconds a stored result stays valid.
+        flush_interval: most seconds a put() waits in memory before it is written.
+        batch_size: most results written per transaction.
+        Signatures and versions must be JSON-serializable (tuples are stored as lists).
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.dropped = 0
+        self.pid = None
+        self.closed = False
+        # Serializes (re)starting the writer so first calls on many threads see it fully built
+        self.start_lock = threading.Lock()
+
+        connection = self._connect()
+        with connection:
+            # WAL lets request threads and other processes read while the writer commits
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " version TEXT NOT NULL, signature TEXT NOT NULL, result TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, PRIMARY KEY (version, signature))"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS results_stored_at ON results (stored_at)")
+        connection.close()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _ensure_started(self):
+        """Open this process's connections and writer thread (again after a fork)."""
+        pid = os.getpid()
+        if self.pid == pid:
+            return
+        with self.start_lock:
+            if self.pid == pid:
+                return
+            self.local = threading.local()
+            self.pending = queue.Queue(maxsize=10 * self.batch_size)
+            self.writer = threading.Thread(target=self._write_behind, name="result-cache-writer", daemon=True)
+            self.writer.start()
+            # Set last: other threads skip the lock once pid matches
+            self.pid = pid
+
+    def _reader(self) -> sqlite3.Connection:
+        """Connection of the calling thread."""
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = self._connect()
+        return connection
+
+    def get(self, signature: Hashable, version: Hashable) -> Optional[Dict]:
+        """Stored result for a signature and index version, or None."""
+        self._ensure_started()
+        row = self._reader().execute(
+            "SELECT result FROM results WHERE version = ? AND signature = ? AND stored_at >= ?",
+            (json.dumps(version), json.dumps(signature), time.time() - self.ttl),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, signature: Hashable, version: Hashable, result: Dict):
+        """Queue a result for the writer thread; never blocks the caller."""
+        self._ensure_started()
+        try:
+            self.pending.put_nowait((json.dumps(version), json.dumps(signature),
+                                     json.dumps(result, ensure_ascii=False), time.time()))
+        except queue.Full:
+            # A cache may lose writes; requests must not wait for the disk
+            self.dropped += 1
+
+    def _write_behind(self):
+        """Writer thread: commit queued results in batches and prune old ones."""
+        connection = self._connect()
+        self._prune(connection)
+        last_prune = time.time()
+        stopping = False
+        while not stopping:
+            try:
+                item = self.pending.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = []
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+            stopping = item is None
+            if batch:
+                with connection:
+                    connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", batch)
+                self.writes += len(batch)
+            if stopping or time.time() - last_prune >= 60:
+                self._prune(connection)
+                last_prune = time.time()
+        connection.close()
+
+    def _prune(self, connection: sqlite3.Connection):
+        """Delete expired results, then the oldest ones beyond max_entries."""
+        with connection:
+            connection.execute("DELETE FROM results WHERE stored_at < ?", (time.time() - self.ttl,))
+            excess = connection.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_entries
+            if excess > 0:
+                connection.execute(
+                    "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY stored_at LIMIT ?)",
+                    (excess,),
+                )
+
+    def flush(self):
+        """Wait until every queued result is written."""
+        with self.start_lock:
+            if self.pid == os.getpid():
+                self.pending.put(None)
+                self.writer.join()
+                self.pid = None
+
+    def close(self):
+        """Write queued results and stop the writer thread."""
+        if not self.closed:
+            self.closed = True
+            self.flush()
+
+    def clear(self):
+        """Drop every stored result."""
+        self.flush()
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM results")
+        connection.close()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and write-behind counters."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "dropped": self.dropped,
+        }
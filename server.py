@@ -4,107 +4,327 @@ Simple HTTP server for the Dream-Quote Matcher web interface.
 Run this script and open dream_matcher.html in your browser.
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, unquote, parse_qs, quote
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, Optional, Tuple
+import gc
 import json
 import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
 from dream_quote_matcher import DreamQuoteMatcher
+from static_assets import StaticAssets
 from pathlib import Path
 
 # Initialize matcher once
+# Set NORMALIZED_EXPLANATIONS=1 to serve the normalized explanation texts
+# Match results are kept in RESULT_CACHE_PATH across restarts (set it empty to disable)
 print("Initializing Dream-Quote Matcher...")
-matcher = DreamQuoteMatcher()
+matcher = DreamQuoteMatcher(
+    normalized_explanations=os.environ.get('NORMALIZED_EXPLANATIONS') == '1',
+    cache_path=os.environ.get('RESULT_CACHE_PATH', 'data/result_cache.sqlite3') or None,
+)
+
+
+class MatchExecutor:
+    """Runs match() on a fixed pool of threads, refusing work once its queue is full."""
+    def __init__(self, workers: int, queue_depth: int):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='match')
+        # One slot per running or waiting match
+        self.slots = threading.BoundedSemaphore(workers + queue_depth)
+    
+    def submit(self, dream_text: str) -> Optional[Future]:
+        """Queue a match, or return None if every slot is taken."""
+        if not self.slots.acquire(blocking=False):
+            return None
+        future = self.pool.submit(interpret, dream_text)
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+# Keep-alive: seconds an idle connection stays open, and requests served per connection
+KEEPALIVE_TIMEOUT = float(os.environ.get('KEEPALIVE_TIMEOUT', 15))
+KEEPALIVE_MAX_REQUESTS = int(os.environ.get('KEEPALIVE_MAX_REQUESTS', 1000))
+# Largest POST body accepted
+MAX_BODY_BYTES = 1024 * 1024
+
+# SERVER_WORKERS > 1 forks that many server processes sharing this matcher
+server_workers = max(1, int(os.environ.get('SERVER_WORKERS', 1)))
+
+# Connections are handled on their own threads, so static files never wait
+# for matching; /match runs on MATCH_WORKERS threads per process (default:
+# the cores divided among the server processes) with up to MATCH_QUEUE_DEPTH
+# requests waiting, and gets 503 beyond that
+match_executor = MatchExecutor(
+    workers=int(os.environ.get('MATCH_WORKERS', max(1, (os.cpu_count() or 1) // server_workers))),
+    queue_depth=int(os.environ.get('MATCH_QUEUE_DEPTH', 64)),
+)
+
+def static_file(request_path: str) -> Optional[Tuple[Path, str]]:
+    """File and content type served for a GET path, or None if no file is served there."""
+    path = urlparse(request_path).path
+    if path == '/' or path == '/dream_matcher.html':
+        return Path('dream_matcher.html'), 'text/html'
+    if path == '/FREUD.PNG' or path == '/freud.png':
+        return Path('FREUD.PNG'), 'image/png'
+    # Book and emoji images - decode path first to handle URL encoding.
+    # Only the images found at startup are served, so "..", repeated slashes
+    # and other spellings of a path never reach the disk or the asset cache
+    image = Path(unquote(path.lstrip('/')))
+    if image in served_images:
+        return image, 'image/png'
+    return None
+
+# Served in place of a missing dream_matcher.html
+MISSING_PAGE = b'<h1>dream_matcher.html not found</h1>'
+
+def served_files() -> Iterator[Tuple[Path, str]]:
+    """Every file static_file() can serve, with its content type."""
+    yield Path('dream_matcher.html'), 'text/html'
+    yield Path('FREUD.PNG'), 'image/png'
+    for folder in (Path('without background'), Path('without background BOOK')):
+        if folder.is_dir():
+            for image in sorted(folder.iterdir()):
+                if image.suffix.lower() == '.png':
+                    yield image, 'image/png'
+
+# Book and emoji images, for static_file() and image_url()
+served_images = frozenset(path for path, content_type in served_files() if path.parent != Path('.'))
+
+def image_url(folder: str, name: Optional[str]) -> Optional[str]:
+    """URL of a book or emoji image, versioned so browsers keep it for good."""
+    if not name:
+        return None
+    image = Path(folder) / name
+    if image not in served_images:
+        return None
+    url = quote(f'/{folder}/{name}')
+    asset = static_assets.get(image, 'image/png')
+    return f'{url}?v={asset.version}' if asset is not None else url
+
+def link_versions(path: Path, body: bytes) -> bytes:
+    """Point the page's Freud portrait at its versioned URL."""
+    if path != Path('dream_matcher.html'):
+        return body
+    freud = static_assets.get(Path('FREUD.PNG'), 'image/png')
+    if freud is None:
+        return body
+    return body.replace(b'src="FREUD.PNG"', f'src="FREUD.PNG?v={freud.version}"'.encode())
+
+def interpret(dream_text: str) -> Dict:
+    """match() result with versioned URLs of each symbol's book and emoji images."""
+    result = matcher.match(dream_text)
+    for symbol in result['symbols']:
+        symbol['book_url'] = image_url('without background BOOK', symbol.get('book'))
+        symbol['emoji_url'] = image_url('without background', symbol.get('emoji'))
+    return result
+
+# Static files are kept in memory (up to STATIC_CACHE_BYTES, default 64 MB)
+# and answered with 304 when the browser's copy is current
+static_assets = StaticAssets(max_bytes=int(os.environ.get('STATIC_CACHE_BYTES', 64 * 1024 * 1024)),
+                             render=link_versions)
+static_assets.preload(served_files())
 print("Server ready!")
 
 class DreamMatcherHandler(BaseHTTPRequestHandler):
+    # Keep connections open between requests (every response has a Content-Length)
+    protocol_version = 'HTTP/1.1'
+    # Idle keep-alive connections are closed after this many seconds
+    timeout = KEEPALIVE_TIMEOUT
+    # Headers and body are separate writes; don't let Nagle delay the body
+    disable_nagle_algorithm = True
+    requests_served = 0
+    
+    def _send(self, status: int, body: bytes = b'', content_type: Optional[str] = None,
+              headers: Tuple[Tuple[str, str], ...] = ()):
+        """Send a complete response and decide whether the connection stays open."""
+        self.requests_served += 1
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-type', content_type)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        if self.requests_served >= KEEPALIVE_MAX_REQUESTS or self.close_connection:
+            self.send_header('Connection', 'close')
+        elif self.request_version == 'HTTP/1.0':
+            # HTTP/1.0 clients asked for keep-alive; confirm it
+            self.send_header('Connection', 'keep-alive')
+        self.end_headers()
+        self.wfile.write(body)
+    
     def do_GET(self):
         """Serve the HTML file and images."""
-        if self.path == '/' or self.path == '/dream_matcher.html':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            
-            html_path = Path('dream_matcher.html')
-            if html_path.exists():
-                with open(html_path, 'rb') as f:
-                    self.wfile.write(f.read())
+        route = static_file(self.path)
+        if route is None:
+            self._send(404)
+            return
+        
+        file_path, content_type = route
+        asset = static_assets.get(file_path, content_type)
+        if asset is None:
+            if content_type == 'text/html':
+                self._send(200, MISSING_PAGE, content_type)
             else:
-                self.wfile.write(b'<h1>dream_matcher.html not found</h1>')
-        elif self.path == '/FREUD.PNG' or self.path == '/freud.png':
-            self.send_response(200)
-            self.send_header('Content-type', 'image/png')
-            self.end_headers()
-            
-            image_path = Path('FREUD.PNG')
-            if image_path.exists():
-                with open(image_path, 'rb') as f:
-                    self.wfile.write(f.read())
-            else:
-                self.send_response(404)
-                self.end_headers()
-        else:
-            # Try to serve book and emoji images - decode path first to handle URL encoding
-            decoded_path = unquote(self.path.lstrip('/'))
-            if decoded_path.startswith('without background'):
-                file_path = Path(decoded_path)
-                
-                if file_path.exists() and file_path.suffix.lower() == '.png':
-                    self.send_response(200)
-                    self.send_header('Content-type', 'image/png')
-                    self.end_headers()
-                    with open(file_path, 'rb') as f:
-                        self.wfile.write(f.read())
-                else:
-                    # Debug: log what we're looking for
-                    print(f"404: Looking for {file_path} (exists: {file_path.exists()})")
-                    print(f"  Original path: {self.path}")
-                    print(f"  Decoded path: {decoded_path}")
-                    self.send_response(404)
-                    self.end_headers()
-            else:
-                self.send_response(404)
-                self.end_headers()
+                # Debug: log what we're looking for
+                print(f"404: Looking for {file_path} (requested {self.path})")
+                self._send(404)
+            return
+        
+        status, body, headers = static_assets.respond(
+            asset, parse_qs(urlparse(self.path).query),
+            self.headers.get('If-None-Match'), self.headers.get('If-Modified-Since'))
+        self._send(status, body, content_type if status == 200 else None, tuple(headers))
     
     def do_POST(self):
         """Handle dream matching requests."""
-        if self.path == '/match':
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
+        # Bodies that cannot be read safely are refused and the connection closed,
+        # since the next request on it would start inside the unread body
+        status = None
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            content_length = -1
+        if 'Transfer-Encoding' in self.headers:
+            status = 501
+        elif content_length < 0:
+            status = 400
+        elif content_length > MAX_BODY_BYTES:
+            status = 413
+        if status is not None:
+            self.close_connection = True
+            self._send(status)
+            return
+        # Read the body even when it is not used, so the next request on this connection starts clean
+        post_data = self.rfile.read(content_length)
+        if self.path != '/match':
+            self._send(404)
+            return
+        
+        try:
+            data = json.loads(post_data.decode('utf-8'))
+            dream_text = data.get('dream', '')
             
-            try:
-                data = json.loads(post_data.decode('utf-8'))
-                dream_text = data.get('dream', '')
-                
-                if not dream_text:
-                    self.send_response(400)
-                    self.send_header('Content-type', 'application/json')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({'error': 'No dream text provided'}).encode())
-                    return
-                
-                # Match the dream
-                result = matcher.match(dream_text)
-                
-                # Send response
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps(result, ensure_ascii=False).encode('utf-8'))
-                
-            except Exception as e:
-                self.send_response(500)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': str(e)}).encode())
-        else:
-            self.send_response(404)
-            self.end_headers()
+            if not dream_text:
+                self._send(400, json.dumps({'error': 'No dream text provided'}).encode(), 'application/json')
+                return
+            
+            # Match the dream on the match pool
+            future = match_executor.submit(dream_text)
+            if future is None:
+                self._send(503, json.dumps({'error': 'Server busy, please try again'}).encode(),
+                           'application/json', (('Retry-After', '1'),))
+                return
+            result = future.result()
+            
+            # Send response
+            self._send(200, json.dumps(result, ensure_ascii=False).encode('utf-8'), 'application/json',
+                       (('Access-Control-Allow-Origin', '*'),))
+            
+        except Exception as e:
+            self._send(500, json.dumps({'error': str(e)}).encode(), 'application/json')
     
     def log_message(self, format, *args):
         """Suppress default logging."""
         pass
 
+class DreamMatcherServer(ThreadingHTTPServer):
+    """Handles each connection on its own thread."""
+    # Queue bursts of new connections instead of refusing them
+    request_queue_size = 128
+    # Set in pre-fork mode so each worker can bind its own socket to the port
+    reuse_port = False
+    
+    def server_bind(self):
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+def _serve_worker(server_address, parent_server: DreamMatcherServer):
+    """Body of a forked worker process; never returns."""
+    code = 0
+    try:
+        if parent_server.reuse_port:
+            # Listen on a socket of our own; the kernel balances connections between workers
+            parent_server.server_close()
+            httpd = DreamMatcherServer(server_address, DreamMatcherHandler, bind_and_activate=False)
+            httpd.reuse_port = True
+            httpd.server_bind()
+            httpd.server_activate()
+        else:
+            httpd = parent_server
+        httpd.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    except Exception:
+        traceback.print_exc()
+        code = 1
+    finally:
+        if matcher.persistent_cache is not None:
+            matcher.persistent_cache.close()
+        os._exit(code)
+
+def run_prefork(server_address, workers: int):
+    """Serve from forked worker processes sharing the loaded matcher, restarting any that exit."""
+    # With SO_REUSEPORT every worker listens on its own socket and this one
+    # only reserves the port; otherwise all workers accept on this socket
+    parent_server = DreamMatcherServer(server_address, DreamMatcherHandler, bind_and_activate=False)
+    parent_server.reuse_port = hasattr(socket, 'SO_REUSEPORT')
+    parent_server.server_bind()
+    if not parent_server.reuse_port:
+        parent_server.server_activate()
+    
+    # Move everything loaded so far out of the garbage collector's reach: it
+    # would otherwise write to every object and unshare the workers' pages
+    gc.collect()
+    gc.freeze()
+    
+    # Workers inherit this handler, so SIGTERM stops them cleanly as well
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    children = {}  # pid -> start time
+    
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            _serve_worker(server_address, parent_server)
+        children[pid] = time.time()
+    
+    for _ in range(workers):
+        spawn()
+    print(f"Started {workers} worker processes")
+    
+    try:
+        while True:
+            pid, status = os.wait()
+            started = children.pop(pid, None)
+            if started is None:
+                continue
+            print(f"Worker {pid} exited (status {status}), restarting it")
+            # Don't spin when workers die right after starting
+            if time.time() - started < 1:
+                time.sleep(1)
+            spawn()
+    except (KeyboardInterrupt, SystemExit):
+        print("\n\nServer stopped.")
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        parent_server.server_close()
+
 def run_server(port=8000):
     """Run the HTTP server."""
     import os
@@ -112,12 +332,18 @@ def run_server(port=8000):
     port = int(os.environ.get('PORT', port))
     
     server_address = ('', port)
-    httpd = HTTPServer(server_address, DreamMatcherHandler)
     print(f"\nDream-Quote Matcher Server")
     print(f"Server running at http://0.0.0.0:{port}/")
     print(f"Open http://localhost:{port}/dream_matcher.html in your browser")
     print("Press Ctrl+C to stop the server\n")
     
+    if server_workers > 1:
+        if hasattr(os, 'fork'):
+            run_prefork(server_address, server_workers)
+            return
+        print("SERVER_WORKERS needs os.fork (not available on this system); running one process")
+    
+    httpd = DreamMatcherServer(server_address, DreamMatcherHandler)
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+In-memory cache of the web interface's static files (page, Freud portrait,
+book and emoji images), shared by server.py and async_server.py.
+Files are read once, get a strong ETag from their content hash, and are
+answered with 304 Not Modified when the browser already has them.
+URLs carrying the content version (?v=<version>) are cached by browsers
+for a year; other URLs are revalidated on every use. A render hook lets
+the server write those versioned URLs into the page it serves.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Cache-Control for versioned URLs: their content never changes
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Cache-Control for everything else: keep a copy, but check its ETag first
+REVALIDATE = 'no-cache'
+
+
+class StaticAsset:
+    """One static file: its validators and, while it fits the cache, its content."""
+    __slots__ = ("path", "content_type", "size", "mtime", "etag", "version", "last_modified", "body", "checked_at",
+                 "generation")
+
+    def __init__(self, path: Path, content_type: str, size: int, mtime: float, digest: str,
+                 body: Optional[bytes], generation: Optional[int] = None):
+        self.path = path
+        self.content_type = content_type
+        self.size = size
+        self.mtime = mtime
+        self.etag = f'"{digest}"'
+        # Short content hash used in versioned URLs
+        self.version = digest[:16]
+        # Rendered content also changes with other files, so the file's mtime does not
+        # date it; rendered assets are validated by ETag only
+        self.last_modified = formatdate(mtime, usegmt=True) if generation is None else None
+        # None when the file did not fit the cache; it is then read per request
+        self.body = body
+        self.checked_at = time.monotonic()
+        # For rendered files: the cache generation they were rendered at
+        self.generation = generation
+
+
+class StaticAssets:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, recheck_interval: float = 2.0,
+                 render: Optional[Callable[[Path, bytes], bytes]] = None):
+        """
+        max_bytes: most file bytes kept in memory; larger sets are read from disk per request.
+        recheck_interval: seconds between checks of a cached file for changes on disk.
+        render: called with each loaded file's path and content, returns the content to serve
+            (e.g. the page with versioned image URLs). Rendered files are always kept in memory
+            and are rendered again whenever another file changes.
+        """
+        self.max_bytes = max_bytes
+        self.recheck_interval = recheck_interval
+        self.render = render
+        self.lock = threading.Lock()
+        self.assets: Dict[str, StaticAsset] = {}
+        self.cached_bytes = 0
+        # Bumped whenever a file's content changes or disappears
+        self.generation = 0
+
+    def preload(self, files: Iterable[Tuple[Path, str]]):
+        """Load (path, content type) files ahead of the first request."""
+        for path, content_type in files:
+            self.get(path, content_type)
+
+    def fresh(self, path: Path) -> Optional[StaticAsset]:
+        """The cached asset at path if get() would return it without touching the disk, else None."""
+        asset = self.assets.get(str(path))
+        if asset is None or time.monotonic() - asset.checked_at >= self.recheck_interval:
+            return None
+        if asset.generation is not None and asset.generation != self.generation:
+            return None
+        return asset
+
+    def get(self, path: Path, content_type: str) -> Optional[StaticAsset]:
+        """The asset at path, reloaded if the file changed; None if the file does not exist."""
+        key = str(path)
+        asset = self.assets.get(key)
+        if asset is not None and asset.generation is not None and asset.generation != self.generation:
+            # Rendered from other files' versions, and one of them changed
+            return self._load(key, path, content_type)
+        if asset is not None and time.monotonic() - asset.checked_at < self.recheck_interval:
+            return asset
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._forget(key)
+            return None
+        if asset is not None and (asset.size, asset.mtime) == (stat.st_size, stat.st_mtime):
+            asset.checked_at = time.monotonic()
+            return asset
+        return self._load(key, path, content_type)
+
+    def _load(self, key: str, path: Path, content_type: str) -> Optional[StaticAsset]:
+        try:
+            with open(path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                body = f.read()
+        except OSError:
+            self._forget(key)
+            return None
+        rendered = False
+        if self.render is not None:
+            source = body
+            body = self.render(path, source)
+            rendered = body is not source
+        digest = hashlib.sha256(body).hexdigest()
+        with self.lock:
+            previous = self.assets.get(key)
+            if previous is not None and previous.body is not None:
+                self.cached_bytes -= len(previous.body)
+            if previous is None or previous.etag != f'"{digest}"':
+                self.generation += 1
+            # A rendered file cannot be read back from disk, so it is always kept
+            keep = rendered or self.cached_bytes + len(body) <= self.max_bytes
+            if keep:
+                self.cached_bytes += len(body)
+            asset = StaticAsset(path, content_type, stat.st_size, stat.st_mtime, digest, body if keep else None,
+                                self.generation if rendered else None)
+            self.assets[key] = asset
+        return asset
+
+    def _forget(self, key: str):
+        with self.lock:
+            asset = self.assets.pop(key, None)
+            if asset is not None:
+                self.generation += 1
+                if asset.body is not None:
+                    self.cached_bytes -= len(asset.body)
+
+    def body(self, asset: StaticAsset) -> bytes:
+        """Content of an asset, from memory or (if it did not fit) from disk."""
+        if asset.body is not None:
+            return asset.body
+        with open(asset.path, 'rb') as f:
+            return f.read()
+
+    def respond(self, asset: StaticAsset, query: Dict[str, List[str]], if_none_match: Optional[str],
+                if_modified_since: Optional[str]) -> Tuple[int, bytes, List[Tuple[str, str]]]:
+        """(status, body, headers) answering a GET for an asset, honoring the request's validators."""
+        versioned = query.get('v', [None])[0] == asset.version
+        headers = [('ETag', asset.etag)]
+        if asset.last_modified is not None:
+            headers.append(('Last-Modified', asset.last_modified))
+        headers.append(('Cache-Control', IMMUTABLE if versioned else REVALIDATE))
+        if self._not_modified(asset, if_none_match, if_modified_since):
+            return 304, b'', headers
+        return 200, self.body(asset), headers
+
+    @staticmethod
+    def _not_modified(asset: StaticAsset, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        # If-None-Match wins over If-Modified-Since when both are sent
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or asset.etag in tags or f'W/{asset.etag}' in tags
+        if if_modified_since is not None and asset.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            # HTTP dates have whole seconds
+            return int(asset.mtime) <= since
+        return False
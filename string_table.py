@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Immutable string table for the matcher's static text (explanations, quotes).
+All strings are stored UTF-8 encoded back to back in one buffer with an
+offsets array, so the matcher holds integer row numbers instead of Python
+strings and decodes only the rows it returns. Saved tables are mmap'd, so
+every process serving the same files shares their pages in the OS page cache.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+MAGIC = b"DQSTRTAB"
+# magic, native byte order is little-endian, row count, tag
+HEADER = struct.Struct("<8s?3xI32s")
+
+
+class StringTable:
+    def __init__(self, data, offsets):
+        """
+        data: UTF-8 bytes of all rows back to back (bytes or a view of a mapping).
+        offsets: row boundaries, len(rows) + 1 integers starting at 0.
+        """
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "StringTable":
+        """Build an in-memory table."""
+        offsets = array("Q", [0])
+        chunks = []
+        for string in strings:
+            encoded = string.encode("utf-8")
+            chunks.append(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+        return cls(b"".join(chunks), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        """Decode one row."""
+        return str(self.data[self.offsets[row]:self.offsets[row + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def save(self, path: Path, tag: str):
+        """Write the table to path; open() only accepts it back with the same tag."""
+        header = HEADER.pack(MAGIC, sys.byteorder == "little", len(self), tag.encode("ascii"))
+        # Write to a temporary file first so readers never see a partial table
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "wb") as f:
+            f.write(header)
+            f.write(array("Q", self.offsets).tobytes())
+            f.write(self.data)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def open(cls, path: Path, tag: str) -> Optional["StringTable"]:
+        """Map a saved table read-only. Returns None if it is missing, damaged or built for another tag."""
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # missing or empty file
+            return None
+
+        if len(mapped) < HEADER.size:
+            return None
+        magic, little_endian, count, file_tag = HEADER.unpack_from(mapped)
+        offsets_end = HEADER.size + 8 * (count + 1)
+        if (magic != MAGIC or little_endian != (sys.byteorder == "little")
+                or file_tag.rstrip(b"\0") != tag.encode("ascii") or len(mapped) < offsets_end):
+            return None
+
+        # Offsets and text stay in the mapping; nothing is copied
+        view = memoryview(mapped)
+        offsets = view[HEADER.size:offsets_end].cast("Q")
+        data = view[offsets_end:]
+        if offsets[count] != len(data):
+            return None
+        return cls(data, offsets)
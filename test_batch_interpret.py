@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Check batch input parsing and --resume handling of interrupted output."""
+
+import io
+import json
+
+from batch_interpret import count_lines, read_records, resume_output
+
+
+def test_read_records_formats_and_errors():
+    lines = [
+        "I saw a snake",
+        '{"id": 7, "dream": "A castle"}',
+        "",
+        '{"dream": null}',
+        "5",
+        "null",
+        '"id"',
+        "{broken",
+        '{"id": "x"}',
+    ]
+    records = list(read_records(io.StringIO("\n".join(lines) + "\n"), "jsonl"))
+    assert [record["index"] for record in records] == list(range(8))
+    assert records[0]["error"].startswith("Invalid JSON")
+    assert records[1] == {"index": 1, "id": 7, "dream": "A castle"}
+    assert records[2] == {"index": 2, "error": 'Field "dream" must be a string'}
+    # Valid JSON that is not an object is an error, not a crash
+    for record in records[3:6]:
+        assert record["error"] == "Expected a JSON object"
+    assert records[6]["error"].startswith("Invalid JSON")
+    # A missing dream is an empty one
+    assert records[7] == {"index": 7, "id": "x", "dream": ""}
+
+    # Auto-detection: only lines starting with "{" are JSON
+    auto = list(read_records(io.StringIO("5\nnull\n{\"dream\": \"Fire\"}\n"), "auto"))
+    assert [record.get("dream") for record in auto] == ["5", "null", "Fire"]
+
+
+def test_resume_drops_partial_last_line(tmp_path):
+    output = tmp_path / "results.jsonl"
+    complete = "".join(json.dumps({"index": i}) + "\n" for i in range(3))
+    output.write_text(complete + '{"index": 3, "res', encoding="utf-8")
+    assert count_lines(str(output)) == (3, len(complete))
+
+    assert resume_output(str(output)) == 3
+    assert output.read_text(encoding="utf-8") == complete
+    # Appended records start on their own line
+    with open(output, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"index": 3}) + "\n")
+    assert [json.loads(line)["index"] for line in output.read_text(encoding="utf-8").splitlines()] == [0, 1, 2, 3]
+
+    assert resume_output(str(tmp_path / "missing.jsonl")) == 0
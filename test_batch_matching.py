@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Check batch matching and NumPy scoring: both must give exactly the results of match()."""
+
+import pytest
+
+import dream_quote_matcher
+from conftest import DREAMS, QUOTES, build_matcher
+
+
+@pytest.mark.parametrize("vector_scoring", [False, True])
+def test_match_many_equals_match(tmp_path, monkeypatch, vector_scoring):
+    if vector_scoring and not dream_quote_matcher.NUMPY_AVAILABLE:
+        pytest.skip("NumPy is not installed")
+    # Score even the shortest candidate lists with NumPy
+    monkeypatch.setattr(dream_quote_matcher, "VECTOR_MIN_CANDIDATES", 1)
+    dreams = DREAMS + [dream.upper() for dream in DREAMS] + [
+        "snakes and castles and fortunes", "the bold friends cast a dream in the air", DREAMS[1],
+    ]
+    batched = build_matcher(tmp_path, monkeypatch, vector_scoring=vector_scoring, cache_size=0).match_many(dreams)
+    single = build_matcher(tmp_path, monkeypatch, vector_scoring=vector_scoring, cache_size=0)
+    assert batched == [single.match(dream) for dream in dreams]
+
+
+def test_vector_quote_ranking_matches_stdlib(tmp_path, monkeypatch):
+    if not dream_quote_matcher.NUMPY_AVAILABLE:
+        pytest.skip("NumPy is not installed")
+    # Enough quotes for whole-corpus candidate lists to pass VECTOR_MIN_CANDIDATES,
+    # with repeated texts and keywords so ties need every tie-break
+    words = ["snake", "castle", "dragon", "fortune", "friends", "water", "fire", "house", "mother"]
+    quotes = list(QUOTES)
+    for i in range(80):
+        first, second = words[i % len(words)], words[(i * 5) % len(words)]
+        quotes.append({"quote": f"The {first} dreams of the {second}.", "author": "Anonymous",
+                       "keywords": [first, second]})
+    vectorized = build_matcher(tmp_path, monkeypatch, quotes, cache_size=0)
+    plain = build_matcher(tmp_path, monkeypatch, quotes, cache_size=0, vector_scoring=False)
+    assert vectorized.vector_scorer is not None
+    entries = [(entry, plain_entry) for entry, plain_entry in zip(vectorized.dream_db, plain.dream_db)
+               if len(entry.quote_candidates) >= dream_quote_matcher.VECTOR_MIN_CANDIDATES]
+    assert entries
+    dreams = DREAMS + ["the mother of dragons by the water and fire", "friends in the house"]
+    for dream in dreams:
+        for entry, plain_entry in entries[:300]:
+            assert vectorized._choose_best_quote(entry, dream) == plain._choose_best_quote(plain_entry, dream)
+        assert vectorized.match(dream) == plain.match(dream)
+        assert vectorized.match_many([dream] * 3) == plain.match_many([dream] * 3)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Check multi-word symbol matching: any-order and strict scans, and longest-phrase selection."""
+
+from phrase_matcher import PhraseMatcher, select_longest
+
+BED_FELLOW, BAG_OF_GOLD, BED_FELLOW_TRAVELER, FELLOW_TRAVELER = range(4)
+
+MATCHER = PhraseMatcher([
+    (BED_FELLOW, [("bed", "bed"), ("fellow", "fellow")]),
+    (BAG_OF_GOLD, [("bag", "bag"), ("gold", "gold")]),
+    (BED_FELLOW_TRAVELER, [("bed", "bed"), ("fellow", "fellow"), ("traveler", "traveler")]),
+    (FELLOW_TRAVELER, [("fellow", "fellow"), ("traveler", "traveler")]),
+])
+
+
+def forms(*tokens):
+    """(token, singular) pairs, with the simple plurals these tests use."""
+    return [(token, token[:-1] if token.endswith("s") else token) for token in tokens]
+
+
+def test_unordered_scan_takes_words_anywhere():
+    # Any order, any distance; an exact token beats an earlier plural
+    assert MATCHER.scan(forms("fellow", "dark", "beds", "bed")) == [(BED_FELLOW, 0, 3, (3, 0))]
+    # Every word of the phrase is needed
+    assert MATCHER.scan(forms("bag", "of", "silver")) == []
+
+
+def test_strict_scan_needs_adjacent_words_in_order():
+    assert MATCHER.scan(forms("fellow", "bed"), strict=True) == []
+    assert MATCHER.scan(forms("bed", "dark", "fellow"), strict=True) == []
+    assert MATCHER.scan(forms("beds", "fellows"), strict=True) == [(BED_FELLOW, 0, 1, (0, 1))]
+    assert MATCHER.scan(forms("gold", "bag", "gold"), strict=True) == [(BAG_OF_GOLD, 1, 2, (1, 2))]
+
+
+def test_select_longest_keeps_longest_non_overlapping():
+    hits = MATCHER.scan(forms("bed", "fellow", "traveler", "bag", "gold"), strict=True)
+    assert [hit[0] for hit in hits] == [BED_FELLOW, BAG_OF_GOLD, BED_FELLOW_TRAVELER, FELLOW_TRAVELER]
+    assert select_longest(hits) == [(BAG_OF_GOLD, 3, 4, (3, 4)), (BED_FELLOW_TRAVELER, 0, 2, (0, 1, 2))]
+    # Equal lengths sharing a token: the leftmost wins
+    overlapping = [hit for hit in hits if hit[0] in (BED_FELLOW, FELLOW_TRAVELER)]
+    assert select_longest(overlapping) == [(BED_FELLOW, 0, 1, (0, 1))]
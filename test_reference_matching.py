@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Check match() against a reference copy of the original full-scan matcher:
+every symbol is tested against the dream and every quote is scored, with
+the same rules and tie-breaks the indexes and candidate lists replaced.
+"""
+
+import json
+import random
+import re
+from pathlib import Path
+
+from conftest import QUOTES, build_matcher
+from tokenizer import normalize_plural
+
+PHRASE_STOPWORDS = {'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
+STOPWORDS = PHRASE_STOPWORDS | {
+    'is', 'was', 'are', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can',
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'my', 'your', 'his', 'her', 'its', 'our', 'their',
+    'me', 'him', 'us', 'them',
+}
+
+# Quotes for every candidate tier: both keywords of a two-word symbol, one
+# keyword, only the symbol in the text (quotes_none), and symbols no quote
+# mentions (every quote is a candidate). Repeated texts exercise tie-breaks.
+TIER_QUOTES = QUOTES + [
+    {"quote": "A bed fellow knows your dreams.", "author": "Anonymous", "keywords": ["bed", "fellow"]},
+    {"quote": "Never trust a fellow who sleeps.", "author": "Anonymous", "keywords": ["fellow", "sleep"]},
+    {"quote": "Every bed is an island.", "author": "Anonymous", "keywords": ["bed", "island"]},
+    {"quote": "The alarm bell rings for the sleeper.", "author": "Anonymous", "keywords": ["ring", "sleeper"]},
+    {"quote": "An art gallery of the mind.", "author": "Anonymous", "keywords": ["mind"]},
+    {"quote": "Water remembers every river.", "author": "Anonymous", "keywords": ["water", "river"]},
+    {"quote": "Water remembers every river.", "author": "Someone Else", "keywords": ["water", "river"]},
+    {"quote": "Snakes and ladders are the game of life.", "author": "Anonymous", "keywords": ["game", "life"]},
+    {"quote": "Fire is a good servant but a bad master.", "author": "Proverb", "keywords": ["fire", "servant", "master"]},
+    {"quote": "A house divided against itself cannot stand.", "author": "Lincoln", "keywords": ["house", "stand"]},
+]
+
+
+class ReferenceMatcher:
+    """The original matcher's loops over every symbol and every quote."""
+
+    def __init__(self, dream_db, quotes, duplicates):
+        self.dream_db = dream_db
+        self.quotes = quotes
+        # The duplicate rules themselves are checked in test_symbol_duplicates.py
+        self.duplicates = duplicates
+
+    @staticmethod
+    def tokenize(text):
+        return [t for t in re.findall(r'\b[a-zA-Z]+\b', text.lower()) if len(t) >= 3 and t not in STOPWORDS]
+
+    def overlap(self, text1, text2):
+        tokens1, tokens2 = set(self.tokenize(text1)), set(self.tokenize(text2))
+        if not tokens1 or not tokens2:
+            return 0.0
+        return len(tokens1 & tokens2) / len(tokens1 | tokens2)
+
+    def find_symbols(self, dream, max_symbols=10):
+        tokens = self.tokenize(dream)
+        token_set = set(tokens)
+        matches = []
+        for entry in self.dream_db:
+            symbol_word = entry["word"].lower()
+            symbol_words = symbol_word.split()
+            score, matched_token = 0, None
+            if len(symbol_words) == 1:
+                singular = normalize_plural(symbol_word)
+                if symbol_word in token_set:
+                    score, matched_token = 1000 + len(symbol_word), symbol_word
+                else:
+                    for token in tokens:
+                        token_singular = normalize_plural(token)
+                        if symbol_word in (token, token_singular) or singular in (token, token_singular):
+                            score, matched_token = 950 + len(symbol_word), token
+                            break
+            else:
+                meaningful = [w for w in symbol_words if len(w) >= 3 and w not in PHRASE_STOPWORDS]
+                matched = []
+                for word in meaningful:
+                    word_singular = normalize_plural(word)
+                    if word in token_set:
+                        matched.append(word)
+                        continue
+                    for token in tokens:
+                        token_singular = normalize_plural(token)
+                        if word_singular == token_singular or word == token_singular or word_singular == token:
+                            matched.append(token)
+                            break
+                    else:
+                        break
+                if meaningful and len(matched) == len(meaningful):
+                    score, matched_token = 500 + len(symbol_word), " ".join(matched)
+            if score:
+                matches.append((score, entry, matched_token))
+        matches.sort(key=lambda x: (-x[0], -len(x[1]["word"])))
+
+        kept = []
+        for score, entry, matched_token in matches:
+            for i, (kept_score, kept_entry, _) in enumerate(kept):
+                if self.duplicates(entry["word"], kept_entry["word"]):
+                    if score > kept_score:
+                        kept[i] = (score, entry, matched_token)
+                    break
+            else:
+                kept.append((score, entry, matched_token))
+            if len(kept) >= max_symbols:
+                break
+        return kept
+
+    def best_explanation(self, entry, dream):
+        scored = [(self.overlap(dream, text), text) for text in entry.get("explanations", [])]
+        scored.sort(key=lambda x: (-x[0], len(x[1])))
+        return scored[0][1] if scored else ""
+
+    @staticmethod
+    def contains(quote, word):
+        return bool(re.search(r'\b' + re.escape(word.lower()) + r'\b', quote.get("quote", "").lower()))
+
+    def best_quote(self, entry, dream):
+        word = entry["word"]
+        keywords = word.lower().split()[:2]
+        if not keywords:
+            return None
+        both, one, none = [], [], []
+        for quote in self.quotes:
+            quote_keywords = {k.lower() for k in quote.get("keywords", [])}
+            count = len({k for k in keywords if k in quote_keywords})
+            if len(keywords) == 2 and count == 2:
+                both.append((count, quote))
+            elif count:
+                one.append((count, quote))
+            elif self.contains(quote, word):
+                none.append((0, quote))
+        candidates = both or one or none or [(0, quote) for quote in self.quotes]
+        scored = [
+            (count * 10 + (5 if self.contains(quote, word) else 0) + self.overlap(dream, quote.get("quote", "")) * 2,
+             count, quote)
+            for count, quote in candidates
+        ]
+        scored.sort(key=lambda x: (-x[0], -x[1], x[2].get("quote", "")))
+        return scored[0][2] if scored else None
+
+    def match(self, dream):
+        chosen, used = [], set()
+        for _, entry, matched_token in self.find_symbols(dream):
+            if any(self.duplicates(entry["word"], other["word"]) for other in chosen):
+                continue
+            tokens = matched_token.split()
+            if {normalize_plural(t) for t in tokens} & {normalize_plural(t) for t in used}:
+                continue
+            used.update(t.lower() for t in tokens)
+            chosen.append(entry)
+            if len(chosen) >= 10:
+                break
+        shown = chosen if len(chosen) < 2 else chosen[:2]
+        return {
+            "symbols": [{
+                "word": entry["word"],
+                "explanation": self.best_explanation(entry, dream),
+                "quote": self.best_quote(entry, dream),
+                "book": entry.get("book"),
+                "emoji": entry.get("emoji"),
+            } for entry in shown],
+            "message": "Please add more details about your dream. What else did you see or feel?" if len(chosen) < 2 else None,
+            "show_freud_only": len(chosen) < 2,
+        }
+
+
+def test_match_equals_full_scan(tmp_path, monkeypatch):
+    matcher = build_matcher(tmp_path, monkeypatch, TIER_QUOTES, cache_size=0)
+    dream_db = json.loads((Path(__file__).parent / "data" / "dream_database.json").read_text(encoding="utf-8"))
+    reference = ReferenceMatcher(dream_db, TIER_QUOTES, matcher._compute_symbols_duplicates)
+
+    rng = random.Random(5)
+    words = [entry["word"] for entry in dream_db]
+    phrases = [word for word in words if len(word.split()) > 1]
+    dreams = [
+        "", "the the the", "I saw a snake", "i SAW a snake!!", "snakes and castles",
+        "My bed fellow and I slept by the water near a river",
+        "An alarm bell rang in the art gallery", "The house was on fire and a dragon flew over it",
+        "fellow bed", "I dreamed about a dragon flying over a castle",
+    ]
+    for _ in range(40):
+        picked = rng.sample(words, rng.randint(1, 4))
+        dreams.append(" ".join(word + rng.choice(["", "s", "es"]) for word in picked))
+    for _ in range(20):
+        tokens = " ".join(rng.sample(phrases, 2)).split()
+        rng.shuffle(tokens)
+        dreams.append(" ".join(tokens))
+
+    tiers = set()
+    for dream in dreams:
+        expected = reference.match(dream)
+        assert matcher.match(dream) == expected, dream
+        for symbol in expected["symbols"]:
+            quote = symbol["quote"]
+            keywords = symbol["word"].lower().split()[:2]
+            matched = quote is not None and set(keywords) & {k.lower() for k in quote["keywords"]}
+            tiers.add("keyword" if matched else "text" if quote and reference.contains(quote, symbol["word"]) else "any")
+    # Every candidate tier was exercised
+    assert tiers == {"keyword", "text", "any"}
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Check the result caches: eviction, version invalidation, copies and persistence."""
+
+import json
+import sys
+import threading
+
+from result_cache import ResultCache, PersistentResultCache
+
+RESULT = {"symbols": [{"word": "Snake", "explanation": "A snake.", "quote": None}], "message": None, "show_freud_only": True}
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResultCache(max_entries=2)
+    cache.put(("a",), 1, RESULT)
+    cache.put(("b",), 1, RESULT)
+    assert cache.get(("a",), 1) == RESULT
+    cache.put(("c",), 1, RESULT)
+    assert cache.get(("b",), 1) is None
+    assert cache.get(("a",), 1) == RESULT
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_limit_and_version_change():
+    size = len(json.dumps(RESULT, ensure_ascii=False).encode("utf-8"))
+    cache = ResultCache(max_entries=100, max_bytes=2 * size)
+    for key in "abc":
+        cache.put((key,), 1, RESULT)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] == 2 * size
+    # Results of another database version are never returned
+    assert cache.get(("c",), 2) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_sizes_are_utf8_bytes():
+    accented = {"symbols": [{"word": "Déjà Vu", "explanation": "Ça recommence…", "quote": None}]}
+    cache = ResultCache()
+    cache.put(("a",), 1, accented)
+    assert cache.stats()["bytes"] == len(json.dumps(accented, ensure_ascii=False).encode("utf-8"))
+    assert cache.get(("a",), 1) == accented
+
+
+def test_hits_are_copies():
+    cache = ResultCache()
+    cache.put(("a",), 1, RESULT)
+    cache.get(("a",), 1)["symbols"].clear()
+    assert cache.get(("a",), 1) == RESULT
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 0
+
+
+def test_persistent_cache_survives_reopen(tmp_path):
+    path = tmp_path / "results.sqlite3"
+    cache = PersistentResultCache(path)
+    cache.put(("a",), ["v1", False], RESULT)
+    cache.close()
+
+    reopened = PersistentResultCache(path)
+    assert reopened.get(("a",), ["v1", False]) == RESULT
+    # A rebuilt database has a new version and never sees old results
+    assert reopened.get(("a",), ["v2", False]) is None
+    reopened.close()
+
+
+def test_persistent_cache_first_use_from_many_threads(tmp_path):
+    # Switch threads as often as possible so they race into the writer's start
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    errors = []
+    try:
+        for attempt in range(20):
+            cache = PersistentResultCache(tmp_path / f"results{attempt}.sqlite3")
+            barrier = threading.Barrier(16)
+
+            def first_use(key):
+                barrier.wait()
+                try:
+                    cache.put((key,), 1, RESULT)
+                    cache.get((key,), 1)
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=first_use, args=(str(n),)) for n in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            cache.flush()
+            assert all(cache.get((str(n),), 1) == RESULT for n in range(16))
+            cache.close()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+
+
+def test_persistent_cache_prunes_expired_and_oldest(tmp_path):
+    path = tmp_path / "results.sqlite3"
+    cache = PersistentResultCache(path, max_entries=2)
+    for key in "abc":
+        cache.put((key,), 1, RESULT)
+    cache.flush()
+    assert cache.get(("a",), 1) is None
+    assert cache.get(("c",), 1) == RESULT
+    cache.close()
+
+    expired = PersistentResultCache(path, ttl=0)
+    assert expired.get(("c",), 1) is None
+    expired.close()
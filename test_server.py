@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Check the threaded server: keep-alive, request limits, refused bodies and 503 when the match pool is full."""
+
+import http.client
+import importlib
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+import dream_quote_matcher
+from conftest import QUOTES
+
+
+@pytest.fixture(scope="module")
+def server_module(tmp_path_factory):
+    """server.py imported over the fixture quotes, without the persistent cache."""
+    quotes_file = tmp_path_factory.mktemp("data") / "quotes_database.json"
+    quotes_file.write_text(json.dumps({"quotes": QUOTES}), encoding="utf-8")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(os.path.dirname(os.path.abspath(__file__)))
+        patch.setattr(dream_quote_matcher, "QUOTES_DB_FILE", quotes_file)
+        patch.setenv("RESULT_CACHE_PATH", "")
+        yield importlib.import_module("server")
+
+
+@pytest.fixture
+def address(server_module, monkeypatch):
+    """Address of a DreamMatcherServer running on a free port."""
+    monkeypatch.chdir(os.path.dirname(os.path.abspath(__file__)))
+    httpd = server_module.DreamMatcherServer(("127.0.0.1", 0), server_module.DreamMatcherHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def raw_exchange(address, request: bytes):
+    """Send raw bytes; return the response head and whether the server then closed the connection."""
+    with socket.create_connection(address, timeout=5) as sock:
+        sock.sendall(request)
+        data = b""
+        while b"\r\n\r\n" not in data:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+        head = data.partition(b"\r\n\r\n")[0]
+        try:
+            while sock.recv(65536):
+                pass
+            closed = True
+        except socket.timeout:
+            closed = False
+    return head.decode("latin-1"), closed
+
+
+def test_keep_alive_until_request_limit(server_module, address, monkeypatch):
+    monkeypatch.setattr(server_module, "KEEPALIVE_MAX_REQUESTS", 3)
+    connection = http.client.HTTPConnection(*address, timeout=5)
+    for served in range(1, 4):
+        connection.request("POST", "/match", body=json.dumps({"dream": "I saw a snake and a castle"}))
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read())["symbols"]
+        # The same socket serves every request until the limit closes it
+        if served < 3:
+            assert response.getheader("Connection") is None
+            assert not response.will_close
+        else:
+            assert response.getheader("Connection") == "close"
+    connection.close()
+
+
+@pytest.mark.parametrize("header, status", [
+    ("Content-Length: abc", "400"),
+    ("Content-Length: -5", "400"),
+    ("Content-Length: 99999999", "413"),
+    ("Transfer-Encoding: chunked", "501"),
+])
+def test_unreadable_bodies_are_refused_and_closed(address, header, status):
+    head, closed = raw_exchange(address, f"POST /match HTTP/1.1\r\nHost: x\r\n{header}\r\n\r\n".encode())
+    assert head.startswith(f"HTTP/1.1 {status} ")
+    assert "Connection: close" in head
+    assert closed
+
+
+def test_busy_match_pool_answers_503(server_module, address, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(server_module, "interpret", lambda dream_text: release.wait(5) and {})
+    executor = server_module.MatchExecutor(workers=1, queue_depth=0)
+    monkeypatch.setattr(server_module, "match_executor", executor)
+    # The only slot is taken
+    running = executor.submit("a dream")
+    try:
+        connection = http.client.HTTPConnection(*address, timeout=5)
+        connection.request("POST", "/match", body=json.dumps({"dream": "I saw a snake"}))
+        response = connection.getresponse()
+        assert response.status == 503
+        assert response.getheader("Retry-After") == "1"
+        assert "error" in json.loads(response.read())
+        connection.close()
+    finally:
+        release.set()
+        running.result()
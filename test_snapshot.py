@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Check the index snapshot: string tables mapped from disk and lazily loaded columns."""
+
+import dream_quote_matcher
+from dream_quote_matcher import DreamQuoteMatcher
+from conftest import DREAMS, QUOTES, build_matcher
+
+
+def test_snapshot_string_tables_match_json(tmp_path, monkeypatch):
+    matcher = build_matcher(tmp_path, monkeypatch)
+    snapshot_file = tmp_path / "matcher_snapshot.pickle"
+    matcher.save_snapshot(snapshot_file)
+    monkeypatch.setattr(dream_quote_matcher, "SNAPSHOT_FILE", snapshot_file)
+    loaded = DreamQuoteMatcher()
+    # Text comes from the mapped files, not the JSON
+    assert isinstance(loaded.quote_texts.data, memoryview)
+    assert [loaded._quote(position) for position in range(len(QUOTES))] == QUOTES
+    for dream in DREAMS:
+        assert loaded.match(dream) == matcher.match(dream)
+
+
+def test_normalized_explanations_load_only_their_column(tmp_path, monkeypatch):
+    matcher = build_matcher(tmp_path, monkeypatch)
+    snapshot_file = tmp_path / "matcher_snapshot.pickle"
+    matcher.save_snapshot(snapshot_file)
+    monkeypatch.setattr(dream_quote_matcher, "SNAPSHOT_FILE", snapshot_file)
+    loaded = DreamQuoteMatcher(normalized_explanations=True)
+    assert loaded.unloaded_columns == {"explanations"}
+    for dream in DREAMS:
+        for symbol in loaded.match(dream)["symbols"]:
+            entry = loaded.dream_word_map[symbol["word"].lower()]
+            normalized = [loaded.normalized_texts[row] for row in entry.normalized_rows]
+            assert symbol["explanation"] in normalized
+    assert loaded.unloaded_columns == {"explanations"}
+    # Other columns are still available on first use
+    assert loaded._symbol_explanations(loaded.dream_db[0]) == matcher._symbol_explanations(matcher.dream_db[0])
+    assert loaded.unloaded_columns == set()
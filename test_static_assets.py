@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Check the static asset cache: validators, 304 answers, versioned URLs and reloads."""
+
+import os
+
+from static_assets import IMMUTABLE, REVALIDATE, StaticAssets
+
+
+def test_validators_and_not_modified(tmp_path):
+    image = tmp_path / "image.png"
+    image.write_bytes(b"png data")
+    assets = StaticAssets()
+    asset = assets.get(image, "image/png")
+
+    status, body, headers = assets.respond(asset, {}, None, None)
+    headers = dict(headers)
+    assert (status, body) == (200, b"png data")
+    assert headers["Cache-Control"] == REVALIDATE
+    assert assets.respond(asset, {}, headers["ETag"], None)[:2] == (304, b"")
+    assert assets.respond(asset, {}, '"other"', headers["Last-Modified"])[0] == 200
+    assert assets.respond(asset, {}, None, headers["Last-Modified"])[0] == 304
+    # Only the current content version is cached for good
+    assert dict(assets.respond(asset, {"v": [asset.version]}, None, None)[2])["Cache-Control"] == IMMUTABLE
+    assert dict(assets.respond(asset, {"v": ["stale"]}, None, None)[2])["Cache-Control"] == REVALIDATE
+
+
+def test_changed_and_oversized_files(tmp_path):
+    small, large = tmp_path / "small.png", tmp_path / "large.png"
+    small.write_bytes(b"a" * 10)
+    large.write_bytes(b"b" * 100)
+    assets = StaticAssets(max_bytes=50, recheck_interval=0)
+    etag = assets.get(small, "image/png").etag
+    # Too big for the cache: served from disk with the same validators
+    assert assets.get(large, "image/png").body is None
+    assert assets.respond(assets.get(large, "image/png"), {}, None, None)[1] == b"b" * 100
+
+    small.write_bytes(b"c" * 12)
+    os.utime(small, (1, 1))
+    assert assets.get(small, "image/png").etag != etag
+    assert assets.cached_bytes == 12
+    small.unlink()
+    assert assets.get(small, "image/png") is None
+    assert assets.cached_bytes == 0
+
+
+def test_rendered_page_links_current_version(tmp_path):
+    page, image = tmp_path / "page.html", tmp_path / "image.png"
+    page.write_bytes(b'<img src="image.png">')
+    image.write_bytes(b"png data")
+
+    def render(path, body):
+        if path != page:
+            return body
+        version = assets.get(image, "image/png").version
+        return body.replace(b'src="image.png"', f'src="image.png?v={version}"'.encode())
+
+    assets = StaticAssets(render=render)
+    html = assets.get(page, "text/html")
+    version = assets.get(image, "image/png").version
+    assert html.body == f'<img src="image.png?v={version}">'.encode()
+    assert assets.fresh(page) is html
+    # The page changes with the image, so its own mtime must not validate it
+    headers = dict(assets.respond(html, {}, None, None)[2])
+    assert "Last-Modified" not in headers
+    assert assets.respond(html, {}, None, "Fri, 01 Jan 2100 00:00:00 GMT")[0] == 200
+    assert assets.respond(html, {}, headers["ETag"], None)[0] == 304
+    # The versioned URL the page links is cached for good
+    headers = dict(assets.respond(assets.get(image, "image/png"), {"v": [version]}, None, None)[2])
+    assert headers["Cache-Control"] == IMMUTABLE
+
+    # A changed image gets a new version, and the page is rendered again with it
+    image.write_bytes(b"new png data")
+    os.utime(image, (1, 1))
+    assets.recheck_interval = 0
+    new_version = assets.get(image, "image/png").version
+    assert new_version != version
+    assert assets.fresh(page) is None
+    assert assets.get(page, "text/html").body == f'<img src="image.png?v={new_version}">'.encode()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Check that the precomputed duplicate-symbol table agrees with the direct duplicate rules."""
+
+import json
+import random
+import re
+from pathlib import Path
+
+import dream_quote_matcher
+from conftest import build_matcher
+
+# Keys the table treats specially: no words at all, or only punctuation
+ODD_SYMBOLS = ["", "   ", "-", "?!", "A.B.", "Bed-", "(Fire)", "Can't", "Bed  Fellow", "Ale-house keeper"]
+
+
+def test_duplicate_table_matches_rules(tmp_path, monkeypatch):
+    entries = json.loads((Path(__file__).parent / "data" / "dream_database.json").read_text(encoding="utf-8"))
+    entries += [{"word": word, "explanations": [f"To dream of {word} is odd."]} for word in ODD_SYMBOLS]
+    dream_file = tmp_path / "dream_database.json"
+    dream_file.write_text(json.dumps(entries), encoding="utf-8")
+    monkeypatch.setattr(dream_quote_matcher, "DREAM_DB_FILE", dream_file)
+    matcher = build_matcher(tmp_path, monkeypatch, use_snapshot=False)
+
+    words = [entry.word for entry in matcher.dream_db]
+    rng = random.Random(3)
+    # Every pair would take minutes with the regex rules. Pair the odd symbols
+    # with every symbol, and punctuated plus sampled symbols with those sharing
+    # their first letter (where most duplicates are) and a random sample
+    pairs = [(word, other) for word in ODD_SYMBOLS for other in words]
+    punctuated = [word for word in words if re.search(r"[^\w\s]", word) and word not in ODD_SYMBOLS]
+    others = rng.sample(words, 200)
+    for word in punctuated + rng.sample(words, 60):
+        pairs += [(word, other) for other in others + [other for other in words if other[:1].lower() == word[:1].lower()]]
+    assert sum(matcher._compute_symbols_duplicates(word, other) for word, other in pairs) > len(pairs) // 100
+    for word, other in pairs:
+        assert matcher._are_symbols_duplicates(word, other) == matcher._compute_symbols_duplicates(word, other), (word, other)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Check that indexed (token ID) overlap scoring and top-K ranking match text-based scoring exactly."""
+
+import dream_quote_matcher
+from conftest import DREAMS, QUOTES, build_matcher
+
+
+def test_indexed_overlap_is_bit_identical(tmp_path, monkeypatch):
+    matcher = build_matcher(tmp_path, monkeypatch)
+    for dream in DREAMS:
+        context = matcher._context(dream)
+        for row, text in enumerate(matcher.explanation_texts):
+            expected = matcher._calculate_token_overlap(dream, text)
+            assert matcher._ids_overlap(context, matcher.explanation_tokens[row]) == expected
+        for position, quote in enumerate(QUOTES):
+            expected = matcher._calculate_token_overlap(dream, quote["quote"])
+            assert matcher._ids_overlap(context, matcher.quote_tokens[position]) == expected
+
+
+def test_best_explanation_unchanged(tmp_path, monkeypatch):
+    matcher = build_matcher(tmp_path, monkeypatch)
+    for dream in DREAMS:
+        for entry in matcher.dream_db:
+            scored = [(matcher._calculate_token_overlap(dream, exp), exp) for exp in matcher._symbol_explanations(entry)]
+            scored.sort(key=lambda x: (-x[0], len(x[1])))
+            expected = scored[0][1] if scored else ""
+            assert matcher._choose_best_explanation(entry, dream) == expected
+
+
+def test_top_k_ranking_matches_full_sort(tmp_path, monkeypatch):
+    matcher = build_matcher(tmp_path, monkeypatch)
+    ties = [(score, letter) for score, letter in zip([3, 1, 3, 2, 1, 3], "abcdef")]
+    assert list(dream_quote_matcher.iter_ranked(ties, key=lambda x: -x[0])) == sorted(ties, key=lambda x: -x[0])
+    for dream in DREAMS:
+        for entry in matcher.dream_db[:500]:
+            assert matcher._rank_explanations(entry, dream, k=2) == matcher._rank_explanations(entry, dream, k=None)[:2]
+            assert matcher._rank_quotes(entry, dream, k=2) == matcher._rank_quotes(entry, dream, k=None)[:2]
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""Check the shared tokenizer: ASCII behavior, Unicode folding and the single-pass analysis."""
+
+from tokenizer import analyze, normalize_plural, tokenize
+
+
+def test_ascii_tokens_and_plurals():
+    assert tokenize("I saw the Snakes, and my KNIVES!! at 3am") == ["saw", "snakes", "knives"]
+    assert [normalize_plural(word) for word in ["cities", "boxes", "wolves", "knives", "glass", "cars"]] == \
+        ["city", "box", "wolf", "knife", "glass", "car"]
+
+
+def test_unicode_input_is_folded():
+    assert tokenize("Déjà vu with my DOPPELGÄNGER") == ["deja", "doppelganger"]
+    # Curly apostrophes split words like straight ones; full-width letters fold to ASCII
+    assert tokenize("the snake’s ｓｋｉｎ") == tokenize("the snake's skin") == ["snake", "skin"]
+
+
+def test_analyze_emits_forms_and_ids():
+    assert analyze("Cars and cities", {"cars": 7}) == [("cars", "car", 7), ("cities", "city", None)]
+
+
+def test_precomputed_singular_forms_win():
+    # Words of the index use the table; other words fall back to the suffix rules
+    assert analyze("Geese and cities", {}, {"geese": "goose"}) == [("geese", "goose", None), ("cities", "city", None)]
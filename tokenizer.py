@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tokenizer and plural normalizer shared by the matcher's index build and
+every match() call. Text is folded to lowercase ASCII where possible, split
+with one precompiled regex and filtered against frozen stopword sets.
+The matcher precomputes singular forms for its index's words; other words
+go through the suffix rules, memoized since dreams reuse a small vocabulary.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+# Words of folded text; a letter outside a-z (e.g. Cyrillic) makes the whole word unmatchable
+WORD_RE = re.compile(r'\b[a-zA-Z]+\b')
+
+# Common words that never count as symbols or overlap
+STOPWORDS = frozenset({
+    'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'was', 'are', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can',
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'my', 'your', 'his', 'her', 'its', 'our', 'their',
+    'me', 'him', 'us', 'them',
+})
+
+# Stopwords ignored inside multi-word symbols (e.g. "Bag of Gold")
+PHRASE_STOPWORDS = frozenset({'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'})
+
+# Most words kept in the singular-form memo; it is emptied when full
+SINGULAR_MEMO_SIZE = 65536
+_singular_memo: Dict[str, str] = {}
+
+# (token, singular form, vocabulary ID or None)
+AnalyzedToken = Tuple[str, str, Optional[int]]
+
+
+def fold(text: str) -> str:
+    """
+    Lowercase text. Non-ASCII text is also case-folded and stripped of accents
+    ("Déjà" -> "deja"), so accented and plain spellings tokenize the same.
+    """
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """Meaningful words of text (3+ letters, not stopwords), folded, in order."""
+    return [token for token in WORD_RE.findall(fold(text)) if len(token) >= 3 and token not in STOPWORDS]
+
+
+def normalize_plural(word: str) -> str:
+    """Singular form of a word (lowercased), e.g. "cities" -> "city"."""
+    singular = _singular_memo.get(word)
+    if singular is None:
+        if len(_singular_memo) >= SINGULAR_MEMO_SIZE:
+            _singular_memo.clear()
+        singular = _singular_memo[word] = _singular(word.lower())
+    return singular
+
+
+def _singular(word_lower: str) -> str:
+    """Suffix rules behind normalize_plural."""
+    # Skip if too short
+    if len(word_lower) <= 2:
+        return word_lower
+
+    # Common plural endings
+    if word_lower.endswith('ies') and len(word_lower) > 4:
+        # cities -> city, flies -> fly
+        return word_lower[:-3] + 'y'
+    elif word_lower.endswith('es') and len(word_lower) > 4:
+        # matches -> match, boxes -> box, buses -> bus
+        if word_lower.endswith(('ches', 'shes', 'xes', 'zes')):
+            return word_lower[:-2]
+        elif word_lower.endswith('ves') and not word_lower.endswith('aves'):  # Don't convert "saves" -> "saf"
+            # leaves -> leaf, knives -> knife, but not "saves"
+            if word_lower.endswith('lves'):
+                return word_lower[:-3] + 'f'  # leaves -> leaf
+            elif word_lower.endswith('ives'):
+                return word_lower[:-3] + 'fe'  # knives -> knife
+            else:
+                return word_lower[:-2]
+        else:
+            return word_lower[:-2]
+    elif word_lower.endswith('s') and len(word_lower) > 3:
+        # cars -> car, wasps -> wasp, but not "is", "as", "us"
+        # Don't remove 's' from words that end in 'ss' (like "class", "glass")
+        if not word_lower.endswith('ss'):
+            return word_lower[:-1]
+
+    return word_lower
+
+
+def analyze(text: str, vocabulary: Dict[str, int],
+            singular_forms: Optional[Dict[str, str]] = None) -> List[AnalyzedToken]:
+    """
+    (token, singular form, vocabulary ID or None) for each meaningful word of text, in one pass.
+    singular_forms: precomputed singular forms; suffix rules only run for words missing from it.
+    """
+    lexicon = singular_forms if singular_forms is not None else {}
+    memo = _singular_memo
+    analyzed = []
+    for token in WORD_RE.findall(fold(text)):
+        if len(token) < 3 or token in STOPWORDS:
+            continue
+        singular = lexicon.get(token) or memo.get(token)
+        if singular is None:
+            singular = normalize_plural(token)
+        analyzed.append((token, singular, vocabulary.get(token)))
+    return analyzed
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Optional NumPy scoring engine for the dream-quote matcher.
+Holds the token sets of all quotes as a CSR incidence matrix (rows =
+quote positions, columns = vocabulary token IDs) and computes the Jaccard
+overlap of a dream with many rows in one vectorized pass.
+The matcher falls back to its pure-stdlib token ID scoring when NumPy is absent.
+"""
+
+from typing import List, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Upper bound on dreams x nonzeros cells per vectorized batch
+MAX_CHUNK_CELLS = 1 << 20
+
+
+class VectorScorer:
+    def __init__(self, row_token_ids: List[List[int]], vocabulary_size: int):
+        """Build the CSR matrix from each row's distinct token IDs."""
+        row_sizes = [len(token_ids) for token_ids in row_token_ids]
+        self.row_sizes = np.array(row_sizes, dtype=np.int64)
+        self.indptr = np.zeros(len(row_sizes) + 1, dtype=np.int64)
+        np.cumsum(self.row_sizes, out=self.indptr[1:])
+        self.indices = np.fromiter(
+            (token_id for token_ids in row_token_ids for token_id in token_ids),
+            dtype=np.int64, count=int(self.indptr[-1]),
+        )
+        self.vocabulary_size = vocabulary_size
+        self.candidate_arrays = None
+
+    def overlaps(self, dream_ids: List[int], oov_count: int, rows=None):
+        """
+        Jaccard overlap between the dream and each row (all rows by default).
+        dream_ids are the dream's distinct in-vocabulary token IDs; oov_count
+        tokens only add to the union. Same values as _calculate_token_overlap.
+        """
+        return self.overlaps_many([(dream_ids, oov_count)], rows)[0]
+
+    def overlaps_many(self, dreams: List[Tuple[List[int], int]], rows=None):
+        """Overlaps for many (dream_ids, oov_count) dreams at once: one row of scores per dream."""
+        if rows is None:
+            sizes = self.row_sizes
+            indices = self.indices
+            ends = self.indptr[1:]
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            sizes = self.row_sizes[rows]
+            ends = np.cumsum(sizes)
+            # Gather the nonzeros of the selected rows back to back
+            offsets = np.repeat(self.indptr[rows] - (ends - sizes), sizes) + np.arange(ends[-1] if len(ends) else 0)
+            indices = self.indices[offsets]
+        starts = ends - sizes
+
+        # Dream indicators only need the columns of tokens these rows contain,
+        # so work arrays stay (dreams x nonzeros) whatever the vocabulary size
+        columns, row_columns = np.unique(indices, return_inverse=True)
+        column_of = np.full(self.vocabulary_size, -1, dtype=np.int64)
+        column_of[columns] = np.arange(len(columns))
+
+        scores = np.zeros((len(dreams), len(sizes)), dtype=np.float64)
+        chunk = max(1, MAX_CHUNK_CELLS // (len(indices) + 1))
+        for first in range(0, len(dreams), chunk):
+            batch = dreams[first:first + chunk]
+            id_counts = np.array([len(dream_ids) for dream_ids, _ in batch], dtype=np.int64)
+            dream_columns = column_of[np.fromiter(
+                (token_id for dream_ids, _ in batch for token_id in dream_ids),
+                dtype=np.int64, count=int(id_counts.sum()),
+            )]
+            dream_rows = np.repeat(np.arange(len(batch)), id_counts)
+            present = dream_columns >= 0
+            dream_matrix = np.zeros((len(batch), len(columns)), dtype=np.int64)
+            dream_matrix[dream_rows[present], dream_columns[present]] = 1
+
+            # Intersections are a sparse dot product: per-row sums of dream hits
+            cumulative = np.zeros((len(batch), len(indices) + 1), dtype=np.int64)
+            np.cumsum(dream_matrix[:, row_columns], axis=1, out=cumulative[:, 1:])
+            intersections = cumulative[:, ends] - cumulative[:, starts]
+
+            dream_sizes = np.array([len(dream_ids) + oov_count for dream_ids, oov_count in batch], dtype=np.int64)
+            unions = sizes + dream_sizes[:, None] - intersections
+            valid = (sizes > 0) & (dream_sizes[:, None] > 0)
+            np.divide(intersections, unions, out=scores[first:first + len(batch)], where=valid)
+        return scores
+
+    def set_candidates(self, static_scores, match_counts, positions):
+        """Quote candidates of all symbols, back to back (static_score, match_count, quote position)."""
+        self.candidate_arrays = (
+            np.array(static_scores, dtype=np.float64),
+            np.array(match_counts, dtype=np.int64),
+            np.array(positions, dtype=np.int64),
+        )
+
+    def candidates(self, candidate_range: range):
+        """(static_scores, match_counts, positions) array views for one symbol's candidate range."""
+        return tuple(array[candidate_range.start:candidate_range.stop] for array in self.candidate_arrays)